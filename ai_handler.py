@@ -3,32 +3,271 @@ AI Handler for Meshtastic AI DM Bot (standalone for meshbotservus).
 Manages Google Gemini API interactions and response generation with per-user chat context.
 """
 
+import asyncio
+import hashlib
 import logging
+import math
+import operator
+import os
+import random
+import re
+import sqlite3
+import threading
 import time
-from typing import Optional, Dict, List
+from typing import Optional, List
 import google.genai as genai
+from google.genai import errors, types
 
 logger = logging.getLogger(__name__)
 
+_ANSWER_RE = re.compile(r"ANSWER\s*(\d+)\s*:", re.IGNORECASE)
+_WS_RE = re.compile(r"\s+")
+_SENT_END_RE = re.compile(r"[.!?](?=\s)|\n| (?=- )")
+
+
+class TokenBucket:
+    """Client-side request budget so calls self-delay instead of burning retries on 429s."""
+    def __init__(self, requests_per_minute: int):
+        self.capacity = float(requests_per_minute)
+        self.rate = requests_per_minute / 60.0
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class ResponseStore:
+    """SQLite-backed exact-match cache of final responses that survives restarts."""
+    EVICT_INTERVAL = 3600  # Seconds between expiry sweeps, checked after each put
+
+    def __init__(self, path: str, max_age_days: int = 7):
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._last_evict = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # WAL stays consistent without an fsync per commit; a crash can only lose the newest entries
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache(h TEXT PRIMARY KEY, prompt TEXT, resp TEXT, ts INTEGER)"
+            )
+            self._conn.commit()
+        threading.Thread(target=self.evict_expired, name="ai-cache-evict", daemon=True).start()
+
+    def get(self, key: str) -> Optional[str]:
+        now = int(time.time())
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT resp FROM cache WHERE h = ? AND ts >= ?", (key, now - self.max_age)
+            ).fetchone()
+            if row:
+                # Refresh on hit so frequently asked prompts are the last to expire
+                self._conn.execute("UPDATE cache SET ts = ? WHERE h = ?", (now, key))
+                self._conn.commit()
+        return row[0] if row else None
+
+    def put(self, key: str, prompt: str, response: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)", (key, prompt, response, int(time.time()))
+            )
+            self._conn.commit()
+        if time.monotonic() - self._last_evict >= self.EVICT_INTERVAL:
+            self.evict_expired()
+
+    def evict_expired(self) -> None:
+        self._last_evict = time.monotonic()
+        try:
+            with self._lock:
+                deleted = self._conn.execute(
+                    "DELETE FROM cache WHERE ts < ?", (int(time.time()) - self.max_age,)
+                ).rowcount
+                self._conn.commit()
+            if deleted:
+                logger.info(f"Evicted {deleted} expired AI cache entries")
+        except Exception as e:
+            logger.warning(f"AI cache eviction failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SemanticCache:
+    """Small in-memory cache that returns a stored response for prompts whose embedding is close enough."""
+    def __init__(self, threshold: float = 0.88, max_entries: int = 256):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: List[tuple] = []  # (unit-length embedding, response)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vec: List[float]) -> Optional[List[float]]:
+        norm = math.sqrt(sum(v * v for v in vec))
+        if not norm:
+            return None
+        return [v / norm for v in vec]
+
+    def lookup(self, vec: List[float]) -> Optional[str]:
+        q = self._unit(vec)
+        if q is None:
+            return None
+        best, best_sim = None, self.threshold
+        with self._lock:
+            for e, response in self._entries:
+                # Both sides are unit-length, so the dot product is the cosine similarity
+                sim = sum(map(operator.mul, e, q))
+                if sim >= best_sim:
+                    best, best_sim = response, sim
+        return best
+
+    def add(self, vec: List[float], response: str) -> None:
+        q = self._unit(vec)
+        if q is None:
+            return
+        with self._lock:
+            self._entries.append((q, response))
+            if len(self._entries) > self.max_entries:
+                del self._entries[0]
+
+
+class PromptCoalescer:
+    """
+    Groups prompts that arrive within a short window into a single multi-prompt Gemini call.
+    A prompt that arrives while nothing is queued or in flight is sent at once, without waiting.
+    """
+    def __init__(self, handler: "AIHandler", max_batch: int = 4, max_wait: float = 0.15):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: set = set()
+
+    def _spawn(self, coro) -> None:
+        # Keep a strong reference so the loop can't garbage-collect a running task
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def submit(self, prompt: str) -> str:
+        """Queue a prompt and wait for its raw reply text."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queue and worker are bound to the loop that created them
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._tasks = set()
+            self._spawn(self._run(self._queue))
+        fut = loop.create_future()
+        self._queue.put_nowait((prompt, fut))
+        return await fut
+
+    def close(self) -> None:
+        """Cancel the worker and any queued or in-flight prompts; a later submit starts fresh."""
+        for task in tuple(self._tasks):
+            task.cancel()
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, fut = self._queue.get_nowait()
+                fut.cancel()
+        self._loop = None
+        self._queue = None
+        self._tasks = set()
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # Only wait for company during a burst; _tasks holds this worker plus in-flight dispatches
+            busy = len(self._tasks) > 1 or not queue.empty()
+            deadline = loop.time() + self.max_wait
+            while busy and len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._spawn(self._dispatch(batch))
+
+    async def _answer(self, prompts: List[str]) -> List:
+        """Return each prompt's reply text, or the exception its own call raised."""
+        handler = self.handler
+        if len(prompts) > 1:
+            try:
+                return await handler._generate_batch_async(prompts)
+            except Exception as e:
+                # One malformed or blocked batch reply shouldn't fail every user in it
+                logger.warning(f"Batched AI request failed, asking individually: {e}")
+        return await asyncio.gather(
+            *(handler._generate_async(handler._concise_prompt(p)) for p in prompts),
+            return_exceptions=True
+        )
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        try:
+            answers = await self._answer([p for p, _ in batch])
+        except asyncio.CancelledError:
+            for _, fut in batch:
+                fut.cancel()
+            raise
+        for (_, fut), answer in zip(batch, answers):
+            if fut.done():
+                continue
+            if isinstance(answer, asyncio.CancelledError):
+                fut.cancel()
+            elif isinstance(answer, BaseException):
+                fut.set_exception(answer)
+            else:
+                fut.set_result(answer)
+
+
 class AIHandler:
     """Handles AI interactions using Google Gemini with per-user chat sessions."""
+    _CONCISE_SUFFIX = (
+        "\n\n(Reply concisely per rules: ~250–450 chars total; never under 200 or over 600; "
+        "use 1–3 short bullets or a compact paragraph; no fluff.)"
+    )
+
     def __init__(self, api_key: str, model_name: str = "gemini-1.5-flash"):
         self.api_key = api_key
         self.model_name = model_name
+        self.embedding_model = "gemini-embedding-001"
         self.model = None
-        self.max_retries = 3
+        self.max_retries = 5
         self.retry_delay = 1.0
+        self.max_retry_delay = 30.0
         self.min_chars = 200
         self.max_chars = 600
         self.ideal_low = 250
         self.ideal_high = 450
+        # Streamed replies are cut this many chars past max_chars, leaving room for whitespace cleanup
+        self.stream_slack = 100
         self.generation_config = {
             "temperature": 0.6,
             "top_p": 0.8,
             "top_k": 40,
             "max_output_tokens": 200,
         }
-        self._chats: Dict[str, any] = {}
+        self._sem_cache = SemanticCache()
+        self._store = self._open_store()
+        self._rate_limiter = TokenBucket(int(os.getenv("GEMINI_RPM", "500")))
+        # Held only around the network call, so backoff sleeps never occupy a slot
+        self._sema = asyncio.Semaphore(int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")))
+        self._coalescer = PromptCoalescer(self)
         self._brevity_preamble = (
             "You are a Meshtastic DM bot with strict brevity rules.\n"
             "- Aim for ~250–450 characters total.\n"
@@ -37,15 +276,58 @@ class AIHandler:
             "- No greetings/preamble/fluff; deliver facts/steps.\n"
             "- If listing steps, use '- <step>'."
         )
+        # Built once: every request reuses the same preamble Part, and cache keys resume from its hash
+        self._preamble_part = types.Part(text=self._brevity_preamble)
+        self._preamble_md5 = hashlib.md5(self._brevity_preamble.encode("utf-8"))
         self._setup_model()
 
+    @staticmethod
+    def _open_store() -> Optional[ResponseStore]:
+        path = os.getenv("AI_CACHE_DB") or os.path.join(
+            os.path.expanduser("~"), ".cache", "meshbotservus", "ai_cache.db"
+        )
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            return ResponseStore(path)
+        except Exception as e:
+            logger.warning(f"Persistent AI cache disabled ({path}): {e}")
+            return None
+
+    def close(self) -> None:
+        """Stop the prompt coalescer and close the persistent cache."""
+        self._coalescer.close()
+        if self._store:
+            self._store.close()
+
+    def _cache_key(self, prompt: str) -> str:
+        h = self._preamble_md5.copy()
+        h.update(prompt.encode("utf-8"))
+        return h.hexdigest()
+
+    def _store_get(self, prompt: str) -> Optional[str]:
+        if not self._store:
+            return None
+        try:
+            return self._store.get(self._cache_key(prompt))
+        except Exception as e:
+            logger.warning(f"AI cache read failed: {e}")
+            return None
+
+    def _store_put(self, prompt: str, response: str) -> None:
+        if not self._store:
+            return
+        try:
+            self._store.put(self._cache_key(prompt), prompt, response)
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {e}")
+
     def _setup_model(self):
         try:
             import ssl
-            import os
 
             # Check if SSL verification should be disabled (for corporate proxies/firewalls)
             disable_ssl = os.getenv('DISABLE_SSL_VERIFY', 'false').lower() == 'true'
+            http_options = None
 
             if disable_ssl:
                 # Disable SSL verification for environments with self-signed certificates
@@ -68,31 +350,23 @@ class AIHandler:
                 except:
                     pass
 
-                # Patch httpx if available (used by google-genai)
-                try:
-                    import httpx
-                    # Create a custom transport that doesn't verify SSL
-                    original_client_init = httpx.Client.__init__
-                    def patched_init(self, *args, **kwargs):
-                        kwargs['verify'] = False
-                        original_client_init(self, *args, **kwargs)
-                    httpx.Client.__init__ = patched_init
-
-                    original_async_client_init = httpx.AsyncClient.__init__
-                    def patched_async_init(self, *args, **kwargs):
-                        kwargs['verify'] = False
-                        original_async_client_init(self, *args, **kwargs)
-                    httpx.AsyncClient.__init__ = patched_async_init
-                except:
-                    pass
+                # Give google-genai its own unverified httpx clients rather than patching httpx
+                # process-wide; the SDK keeps them for the life of the client, so connections are pooled
+                import httpx
+                insecure_ctx = ssl._create_unverified_context()
+                client_kwargs = {"verify": insecure_ctx, "timeout": None, "follow_redirects": True}
+                http_options = types.HttpOptions(
+                    httpx_client=httpx.Client(**client_kwargs),
+                    httpx_async_client=httpx.AsyncClient(**client_kwargs),
+                )
 
-            self.client = genai.Client(api_key=self.api_key)
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
 
-            # List available models and pick the first supported one for free accounts
-            available_models = [m for m in self.client.models.list() if hasattr(m, 'name')]
-            logger.info("Available Gemini models:")
-            for m in available_models:
-                logger.info(f"  - {m.name}")
+            # Model discovery costs a full round-trip per startup; only do it when asked to
+            if os.getenv("LOG_GEMINI_MODELS") == "1":
+                logger.info("Available Gemini models:")
+                for m in self.client.models.list():
+                    logger.info(f"  - {m.name}")
 
             # Force use of gemini-2.5-flash
             self.model_name = "gemini-2.5-flash"
@@ -102,27 +376,27 @@ class AIHandler:
             logger.error(f"Failed to initialize Gemini client: {e}")
             raise
 
-    def _get_or_create_chat(self, user_id: str):
-        # For google.genai, chat history is not supported in the same way. We'll use user_id for context, but send prompt directly.
-        return user_id
-
     @staticmethod
     def _extract_text(response) -> str:
         try:
-            if hasattr(response, "text") and response.text:
-                return response.text
+            text = getattr(response, "text", None)
+            if text:
+                return text
         except Exception:
             pass
         try:
-            cand0 = getattr(response, "candidates", [None])[0]
-            if cand0 and hasattr(cand0, "content"):
-                parts = getattr(cand0.content, "parts", []) or []
-                texts: List[str] = []
-                for p in parts:
+            cands = getattr(response, "candidates", None)
+            cand0 = cands[0] if cands else None
+            content = getattr(cand0, "content", None)
+            if content is not None:
+                texts: Optional[List[str]] = None
+                for p in getattr(content, "parts", None) or ():
                     t = getattr(p, "text", None)
                     if not t and isinstance(p, dict):
                         t = p.get("text")
                     if t:
+                        if texts is None:
+                            texts = []
                         texts.append(t)
                 if texts:
                     return "\n".join(texts)
@@ -130,66 +404,299 @@ class AIHandler:
             pass
         return str(response)
 
-    def _clean_whitespace(self, s: str) -> str:
-        return " ".join(s.split())
-
-    def _trim_to_max_chars(self, s: str) -> str:
-        s = s.strip()
+    def _normalize(self, raw: str) -> str:
+        """Collapse whitespace and, if over max_chars, cut at the last sentence boundary that fits."""
+        s = _WS_RE.sub(" ", raw).strip()
         if len(s) <= self.max_chars:
             return s
-        cutoff = self.max_chars
-        candidates = []
-        for p in [". ", "! ", "? ", "\n", " - "]:
-            idx = s.rfind(p, 0, cutoff)
-            if idx != -1:
-                candidates.append(idx + len(p.strip()))
-        if candidates:
-            return s[:max(candidates)].strip()
-        return s[:self.max_chars].rstrip()
-
-    def _ensure_length_bounds(self, chat, base_prompt: str, first_try_text: str) -> str:
-        text = self._clean_whitespace(first_try_text)
+        head = s[:self.max_chars]
+        m = None
+        for m in _SENT_END_RE.finditer(head):
+            pass
+        if m:
+            # Keep sentence punctuation; drop a newline or " - " separator
+            cut = m.end() if m.group() in ".!?" else m.start()
+            return head[:cut].rstrip()
+        return head.rstrip()
+
+    def _expand_prompt(self, base_prompt: str, text: str) -> str:
+        return (
+            f"{base_prompt}\n\nAssistant (previous): {text}\n\n"
+            "Please expand the previous answer to roughly "
+            f"{self.ideal_low}–{self.ideal_high} characters. "
+            "Do not add fluff; add only essential specifics."
+        )
+
+    def _ensure_length_bounds(self, base_prompt: str, first_try_text: str) -> str:
+        text = self._normalize(first_try_text)
         if len(text) < self.min_chars:
             try:
-                expand_prompt = (
-                    "Please expand the previous answer to roughly "
-                    f"{self.ideal_low}–{self.ideal_high} characters. "
-                    "Do not add fluff; add only essential specifics."
+                self._wait_for_budget()
+                resp = self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=self._build_contents(self._expand_prompt(base_prompt, text)),
                 )
-                resp = chat.send_message(expand_prompt)
-                expanded = self._extract_text(resp).strip()
-                expanded = self._clean_whitespace(expanded) or text
-                text = expanded
+                text = self._normalize(self._extract_text(resp)) or text
             except Exception as e:
                 logger.warning(f"Expansion step failed: {e}")
-        if len(text) > self.max_chars:
-            text = self._trim_to_max_chars(text)
         return text
 
-    def chat_respond(self, user_id: str, prompt: str) -> str:
-        if not self.client:
-            raise Exception("AI model not initialized")
-        concise_prompt = (
-            f"{prompt}\n\n"
-            "(Reply concisely per rules: ~250–450 chars total; never under 200 or over 600; "
-            "use 1–3 short bullets or a compact paragraph; no fluff.)"
+    async def _ensure_length_bounds_async(self, base_prompt: str, first_try_text: str) -> str:
+        text = self._normalize(first_try_text)
+        if len(text) < self.min_chars:
+            try:
+                await self._wait_for_budget_async()
+                async with self._sema:
+                    resp = await self.client.aio.models.generate_content(
+                        model=self.model_name,
+                        contents=self._build_contents(self._expand_prompt(base_prompt, text)),
+                    )
+                text = self._normalize(self._extract_text(resp)) or text
+            except Exception as e:
+                logger.warning(f"Expansion step failed: {e}")
+        return text
+
+    @staticmethod
+    def _is_retryable(e: Exception) -> bool:
+        # Rate limits and server/transport errors are transient; other 4xx fail the same way again
+        if isinstance(e, errors.ClientError):
+            return e.code == 429
+        return True
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return min(self.retry_delay * 2 ** attempt + random.uniform(0, 1), self.max_retry_delay)
+
+    def _wait_for_budget(self) -> None:
+        wait = self._rate_limiter.reserve()
+        if wait:
+            logger.info(f"Gemini request budget exhausted, waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    async def _wait_for_budget_async(self) -> None:
+        wait = self._rate_limiter.reserve()
+        if wait:
+            logger.info(f"Gemini request budget exhausted, waiting {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+    def _embed(self, prompt: str) -> Optional[List[float]]:
+        try:
+            self._wait_for_budget()
+            resp = self.client.models.embed_content(
+                model=self.embedding_model,
+                contents=prompt,
+                config=types.EmbedContentConfig(output_dimensionality=256),
+            )
+            return list(resp.embeddings[0].values)
+        except Exception as e:
+            logger.debug(f"Prompt embedding failed, skipping semantic cache: {e}")
+            return None
+
+    async def _embed_async(self, prompt: str) -> Optional[List[float]]:
+        try:
+            await self._wait_for_budget_async()
+            async with self._sema:
+                resp = await self.client.aio.models.embed_content(
+                    model=self.embedding_model,
+                    contents=prompt,
+                    config=types.EmbedContentConfig(output_dimensionality=256),
+                )
+            return list(resp.embeddings[0].values)
+        except Exception as e:
+            logger.debug(f"Prompt embedding failed, skipping semantic cache: {e}")
+            return None
+
+    def _concise_prompt(self, prompt: str) -> str:
+        return prompt + self._CONCISE_SUFFIX
+
+    def _build_contents(self, concise_prompt: str) -> types.Content:
+        # Byte-identical rules go first so Gemini's implicit prefix cache can match across requests
+        return types.Content(
+            role="user",
+            parts=[self._preamble_part, types.Part(text=concise_prompt)],
         )
+
+    def _batch_prompt(self, prompts: List[str]) -> str:
+        questions = "\n\n".join(f"{i}) {p}" for i, p in enumerate(prompts, 1))
+        return (
+            "Answer each numbered question below independently, applying the rules above to each answer. "
+            "Start every answer on a new line with 'ANSWER <n>:' using the question's number.\n\n"
+            f"{questions}"
+        )
+
+    @staticmethod
+    def _split_answers(text: str, count: int) -> List[Optional[str]]:
+        answers: List[Optional[str]] = [None] * count
+        matches = list(_ANSWER_RE.finditer(text))
+        for i, m in enumerate(matches):
+            idx = int(m.group(1)) - 1
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            if 0 <= idx < count:
+                answers[idx] = text[m.end():end].strip() or None
+        return answers
+
+    def _stream_text(self, contents: types.Content, stop_after: int) -> str:
+        chunks: List[str] = []
+        length = 0
+        stream = self.client.models.generate_content_stream(model=self.model_name, contents=contents)
+        try:
+            for chunk in stream:
+                t = chunk.text
+                if t:
+                    chunks.append(t)
+                    length += len(t)
+                    if length >= stop_after:
+                        break
+        finally:
+            # Closing the stream drops the connection, which stops generation server-side
+            stream.close()
+        return "".join(chunks)
+
+    async def _stream_text_async(self, contents: types.Content, stop_after: int) -> str:
+        chunks: List[str] = []
+        length = 0
+        stream = await self.client.aio.models.generate_content_stream(model=self.model_name, contents=contents)
+        try:
+            async for chunk in stream:
+                t = chunk.text
+                if t:
+                    chunks.append(t)
+                    length += len(t)
+                    if length >= stop_after:
+                        break
+        finally:
+            await stream.aclose()
+        return "".join(chunks)
+
+    def _generate(self, concise_prompt: str, stream: bool = True) -> str:
+        """
+        Call Gemini with rate limiting and retries; returns the stripped reply ('' if every attempt was empty).
+        When streaming, generation stops once enough text for max_chars has arrived.
+        """
         for attempt in range(self.max_retries):
+            self._wait_for_budget()
             try:
-                resp = self.client.models.generate_content(model=self.model_name, contents=concise_prompt)
-                raw = self._extract_text(resp).strip()
+                contents = self._build_contents(concise_prompt)
+                if stream:
+                    raw = self._stream_text(contents, self.max_chars + self.stream_slack).strip()
+                else:
+                    resp = self.client.models.generate_content(model=self.model_name, contents=contents)
+                    raw = self._extract_text(resp).strip()
                 if raw:
-                    bounded = self._ensure_length_bounds(user_id, concise_prompt, raw)
-                    logger.info(
-                        f"AI chat response (attempt {attempt + 1}) len={len(bounded)}"
-                    )
-                    return bounded
+                    logger.info(f"AI chat response (attempt {attempt + 1}) len={len(raw)}")
+                    return raw
+                logger.warning(f"Empty AI chat response (attempt {attempt + 1})")
+            except Exception as e:
+                logger.warning(f"AI chat attempt {attempt + 1} failed: {e}")
+                if not self._is_retryable(e):
+                    logger.error("AI chat failed with a non-retryable error")
+                    raise Exception(f"AI generation failed: {e}")
+                if attempt < self.max_retries - 1:
+                    time.sleep(self._backoff_delay(attempt))
+                else:
+                    logger.error("All AI chat attempts failed")
+                    raise Exception(f"AI generation failed after {self.max_retries} attempts: {e}")
+        return ""
+
+    async def _generate_async(self, concise_prompt: str, stream: bool = True) -> str:
+        """Async variant of _generate."""
+        for attempt in range(self.max_retries):
+            await self._wait_for_budget_async()
+            try:
+                contents = self._build_contents(concise_prompt)
+                async with self._sema:
+                    if stream:
+                        raw = (await self._stream_text_async(contents, self.max_chars + self.stream_slack)).strip()
+                    else:
+                        resp = await self.client.aio.models.generate_content(model=self.model_name, contents=contents)
+                        raw = self._extract_text(resp).strip()
+                if raw:
+                    logger.info(f"AI chat response (attempt {attempt + 1}) len={len(raw)}")
+                    return raw
                 logger.warning(f"Empty AI chat response (attempt {attempt + 1})")
             except Exception as e:
                 logger.warning(f"AI chat attempt {attempt + 1} failed: {e}")
+                if not self._is_retryable(e):
+                    logger.error("AI chat failed with a non-retryable error")
+                    raise Exception(f"AI generation failed: {e}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))
+                    await asyncio.sleep(self._backoff_delay(attempt))
                 else:
                     logger.error("All AI chat attempts failed")
                     raise Exception(f"AI generation failed after {self.max_retries} attempts: {e}")
-        return "I’m having trouble responding right now. Please try again."
+        return ""
+
+    async def _generate_batch_async(self, prompts: List[str]) -> List[str]:
+        """Answer several prompts with one Gemini call; any answer missing from the reply is asked for on its own."""
+        logger.info(f"Batching {len(prompts)} AI prompts into one request")
+        # Not streamed: cutting the reply early would drop the later answers
+        reply = await self._generate_async(self._batch_prompt(prompts), stream=False)
+        answers = self._split_answers(reply, len(prompts))
+        missing = [i for i, a in enumerate(answers) if a is None]
+        if missing:
+            logger.warning(f"Batched reply missing {len(missing)} answer(s); asking individually")
+            retried = await asyncio.gather(
+                *(self._generate_async(self._concise_prompt(prompts[i])) for i in missing)
+            )
+            for i, text in zip(missing, retried):
+                answers[i] = text
+        return answers
+
+    def chat_respond(self, user_id: str, prompt: str) -> str:
+        if not self.client:
+            raise Exception("AI model not initialized")
+        stored = self._store_get(prompt)
+        if stored:
+            logger.info(f"AI chat response served from persistent cache len={len(stored)}")
+            return stored
+        query_vec = self._embed(prompt)
+        if query_vec is not None:
+            cached = self._sem_cache.lookup(query_vec)
+            if cached:
+                logger.info(f"AI chat response served from semantic cache len={len(cached)}")
+                return cached
+        concise_prompt = self._concise_prompt(prompt)
+        raw = self._generate(concise_prompt)
+        if not raw:
+            return "I’m having trouble responding right now. Please try again."
+        bounded = self._ensure_length_bounds(concise_prompt, raw)
+        if query_vec is not None:
+            self._sem_cache.add(query_vec, bounded)
+        self._store_put(prompt, bounded)
+        return bounded
+
+    async def chat_respond_async(self, user_id: str, prompt: str) -> str:
+        """
+        Async variant of chat_respond; awaits Gemini without blocking the event loop.
+        Prompts arriving close together are answered by one batched request.
+        """
+        if not self.client:
+            raise Exception("AI model not initialized")
+        # SQLite commits block, so keep them off the event loop
+        stored = await asyncio.to_thread(self._store_get, prompt)
+        if stored:
+            logger.info(f"AI chat response served from persistent cache len={len(stored)}")
+            return stored
+        query_vec = await self._embed_async(prompt)
+        if query_vec is not None:
+            cached = self._sem_cache.lookup(query_vec)
+            if cached:
+                logger.info(f"AI chat response served from semantic cache len={len(cached)}")
+                return cached
+        raw = await self._coalescer.submit(prompt)
+        if not raw:
+            return "I’m having trouble responding right now. Please try again."
+        bounded = await self._ensure_length_bounds_async(self._concise_prompt(prompt), raw)
+        if query_vec is not None:
+            self._sem_cache.add(query_vec, bounded)
+        await asyncio.to_thread(self._store_put, prompt, bounded)
+        return bounded
+
+    async def batch_respond(self, user_ids: List[str], prompts: List[str]) -> List:
+        """
+        Answer several prompts concurrently; in-flight calls are capped by GEMINI_MAX_CONCURRENCY.
+        Returns one entry per prompt: the response text, or the exception it raised.
+        """
+        return await asyncio.gather(
+            *(self.chat_respond_async(u, p) for u, p in zip(user_ids, prompts)),
+            return_exceptions=True
+        )
@@ -9,9 +9,11 @@ Intercepts /gem commands and forwards to Gemini AI.
 
 import asyncio
 import argparse
+import itertools
 import logging
 import os
 import random
+import socket
 import struct
 import sys
 import time
@@ -33,9 +35,33 @@ logger = logging.getLogger(__name__)
 logging.getLogger('httpx').setLevel(logging.WARNING)
 logging.getLogger('httpcore').setLevel(logging.WARNING)
 
+# Meshtastic protobufs (optional: without them frames are forwarded but not decoded)
+try:
+    from meshtastic import mesh_pb2, portnums_pb2
+    _TEXT_APP = portnums_pb2.TEXT_MESSAGE_APP
+    # Length-delimited wire tags of ToRadio.packet / FromRadio.packet
+    _TO_RADIO_PACKET_TAG = mesh_pb2.ToRadio.DESCRIPTOR.fields_by_name['packet'].number << 3 | 2
+    _FROM_RADIO_PACKET_TAG = mesh_pb2.FromRadio.DESCRIPTOR.fields_by_name['packet'].number << 3 | 2
+    _PB_OK = True
+except ImportError:
+    mesh_pb2 = portnums_pb2 = None
+    _TEXT_APP = _TO_RADIO_PACKET_TAG = _FROM_RADIO_PACKET_TAG = None
+    _PB_OK = False
+    logger.warning("Meshtastic protobuf not available - message parsing and AI responses disabled")
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Meshtastic TCP protocol constants
 MESHTASTIC_MAGIC = b'\x94\xc3'
 HEADER_SIZE = 4  # 2 bytes magic + 2 bytes length
+_HDR_LEN = struct.Struct('>H')  # big-endian uint16 payload length
+
+# Packet IDs only need to be unique per session: a random base XOR a counter
+_id_base = random.randint(1, 0xFFFFFFFF)
+_id_counter = itertools.count(1)
 
 # Default configuration
 DEFAULT_LISTEN_HOST = '0.0.0.0'
@@ -44,6 +70,90 @@ DEFAULT_RADIO_HOST = '192.168.2.144'
 DEFAULT_RADIO_PORT = 4403
 DEFAULT_CHANNEL_INDEX = 2
 DEFAULT_RESPONSE_DELAY = 2.0
+KEEPALIVE_IDLE = 30  # Seconds of silence before TCP keepalive probes start
+CLIENT_QUEUE_SIZE = 64  # Frames buffered for a slow client before the oldest is dropped
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> tuple:
+    """
+    Read one Meshtastic frame from the stream.
+    Returns (raw_frame, payload); bytes before the magic are discarded.
+    Raises asyncio.IncompleteReadError when the stream is closed.
+    """
+    header = await reader.readexactly(HEADER_SIZE)
+    while not header.startswith(MESHTASTIC_MAGIC):
+        # Out of sync - reuse a (partial) magic already read, else scan the stream for it
+        pos = header.find(MESHTASTIC_MAGIC[:1], 1)
+        if pos != -1:
+            header = header[pos:] + await reader.readexactly(pos)
+            continue
+        try:
+            await reader.readuntil(MESHTASTIC_MAGIC)
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+            header = await reader.readexactly(HEADER_SIZE)
+            continue
+        header = MESHTASTIC_MAGIC + await reader.readexactly(HEADER_SIZE - len(MESHTASTIC_MAGIC))
+
+    length = _HDR_LEN.unpack_from(header, 2)[0]
+    payload = await reader.readexactly(length)
+    return header + payload, payload
+
+
+def _tune_socket(writer: asyncio.StreamWriter,
+                 nodelay: bool = True,
+                 sndbuf: int = 0,
+                 rcvbuf: int = 0) -> None:
+    """Enable keepalive so dead peers get reaped, and apply the configured socket options.
+
+    asyncio already sets TCP_NODELAY on its TCP transports, so nodelay=False is the only
+    case that changes anything. sndbuf/rcvbuf are buffer sizes in bytes; 0 keeps the OS default.
+    """
+    sock = writer.get_extra_info('socket')
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if not nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+        if sndbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        if rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        # Not every platform exposes the idle time (macOS names it TCP_KEEPALIVE)
+        keepidle = getattr(socket, 'TCP_KEEPIDLE', None) or getattr(socket, 'TCP_KEEPALIVE', None)
+        if keepidle is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, keepidle, KEEPALIVE_IDLE)
+    except OSError as e:
+        logger.debug("Failed to set socket options: %s", e)
+
+
+async def _wait_closed(writer: asyncio.StreamWriter) -> None:
+    """Wait for a closed writer to finish, ignoring connection errors."""
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass
+
+
+def _wrap_packet(tag: int, packet: bytes) -> bytes:
+    """Frame an already serialized MeshPacket as the only field of a ToRadio/FromRadio."""
+    # Protobuf varint length prefix
+    n = len(packet)
+    prefix = bytearray((tag,))
+    while n > 0x7F:
+        prefix.append((n & 0x7F) | 0x80)
+        n >>= 7
+    prefix.append(n)
+    payload = bytes(prefix) + packet
+    return MESHTASTIC_MAGIC + _HDR_LEN.pack(len(payload)) + payload
+
+
+def new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, using uvloop when it is installed."""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
 
 
 @dataclass
@@ -53,58 +163,8 @@ class ClientConnection:
     writer: asyncio.StreamWriter
     address: str
     id: int
-
-
-class MeshtasticProtocolParser:
-    """Parses Meshtastic TCP protocol frames."""
-
-    def __init__(self):
-        self.buffer = bytearray()
-
-    def add_data(self, data: bytes) -> list:
-        """
-        Add data to buffer and extract complete frames.
-        Returns list of (raw_frame, payload) tuples.
-        """
-        self.buffer.extend(data)
-        frames = []
-
-        while len(self.buffer) >= HEADER_SIZE:
-            # Look for magic bytes (0x94 0xc3)
-            if self.buffer[0:2] != MESHTASTIC_MAGIC:
-                # Search for complete magic sequence
-                magic_pos = -1
-                for i in range(len(self.buffer) - 1):
-                    if self.buffer[i:i+2] == MESHTASTIC_MAGIC:
-                        magic_pos = i
-                        break
-
-                if magic_pos == -1:
-                    # No magic found, keep last byte in case it's start of magic
-                    if self.buffer and self.buffer[-1] == MESHTASTIC_MAGIC[0]:
-                        self.buffer = self.buffer[-1:]
-                    else:
-                        self.buffer.clear()
-                    break
-                else:
-                    # Skip to magic position
-                    self.buffer = self.buffer[magic_pos:]
-                continue
-
-            # Parse length (big-endian uint16)
-            length = struct.unpack('>H', self.buffer[2:4])[0]
-            total_size = HEADER_SIZE + length
-
-            if len(self.buffer) < total_size:
-                break  # Need more data
-
-            # Extract complete frame
-            raw_frame = bytes(self.buffer[:total_size])
-            payload = bytes(self.buffer[HEADER_SIZE:total_size])
-            frames.append((raw_frame, payload))
-            self.buffer = self.buffer[total_size:]
-
-        return frames
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE))
+    writer_task: Optional[asyncio.Task] = None
 
 
 class GeminiIntegration:
@@ -128,7 +188,12 @@ class GeminiIntegration:
         except Exception as e:
             logger.error(f"Failed to initialize Gemini: {e}")
 
-    def process_message(self, sender_id: str, message: str) -> Optional[str]:
+    def close(self) -> None:
+        """Shut down the AI handler's background work."""
+        if self.ai_handler:
+            self.ai_handler.close()
+
+    async def process_message(self, sender_id: str, message: str) -> Optional[str]:
         """
         Process a message and return AI response if it's a /gem command.
         """
@@ -144,7 +209,7 @@ class GeminiIntegration:
 
         try:
             logger.info(f"Processing /gem from {sender_id}: {prompt[:50]}...")
-            response = self.ai_handler.chat_respond(sender_id, prompt)
+            response = await self.ai_handler.chat_respond_async(sender_id, prompt)
             logger.info(f"Gemini response: {len(response)} chars")
             return response
         except Exception as e:
@@ -170,8 +235,14 @@ class MultiClientProxy:
                  channel_index: int = DEFAULT_CHANNEL_INDEX,
                  response_delay: float = DEFAULT_RESPONSE_DELAY,
                  on_ready_callback=None,
+                 on_radio_state=None,
+                 on_client_change=None,
                  telegram_bot_token: Optional[str] = None,
-                 telegram_chat_id: Optional[str] = None):
+                 telegram_chat_id: Optional[str] = None,
+                 tcp_nodelay: bool = True,
+                 reuse_port: bool = False,
+                 sndbuf: int = 0,
+                 rcvbuf: int = 0):
         self.listen_host = listen_host
         self.listen_port = listen_port
         self.radio_host = radio_host
@@ -179,18 +250,33 @@ class MultiClientProxy:
         self.channel_index = channel_index
         self.response_delay = response_delay
         self.on_ready_callback = on_ready_callback
+        self.on_radio_state = on_radio_state
+        self.on_client_change = on_client_change
+
+        # Socket tuning; buffer sizes are in bytes, 0 keeps the OS default
+        self.tcp_nodelay = tcp_nodelay
+        self.reuse_port = reuse_port
+        self.sndbuf = sndbuf
+        self.rcvbuf = rcvbuf
 
         # Client management
         self.clients: Dict[int, ClientConnection] = {}
         self.client_id_counter = 0
-        self.clients_lock = asyncio.Lock()
 
         # Shared radio connection
         self.radio_reader: Optional[asyncio.StreamReader] = None
         self.radio_writer: Optional[asyncio.StreamWriter] = None
-        self.radio_lock = asyncio.Lock()
         self.radio_connected = asyncio.Event()
 
+        # The want_config request never changes, so build its frame once for every (re)connect
+        self._want_config_id = None
+        self._want_config_frame = None
+        if _PB_OK:
+            to_radio = mesh_pb2.ToRadio()
+            to_radio.want_config_id = self._want_config_id = self._generate_packet_id()
+            payload = to_radio.SerializeToString()
+            self._want_config_frame = MESHTASTIC_MAGIC + _HDR_LEN.pack(len(payload)) + payload
+
         # AI integration
         self.gemini = GeminiIntegration()
 
@@ -213,6 +299,28 @@ class MultiClientProxy:
         # Control
         self.running = False
         self.server = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _track(self, task: asyncio.Task) -> asyncio.Task:
+        # Keep a strong reference so the loop can't garbage-collect a running task,
+        # and so stop() can cancel everything the proxy has running
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _spawn(self, coro) -> asyncio.Task:
+        return self._track(asyncio.create_task(coro))
+
+    def _set_radio_connected(self, connected: bool) -> None:
+        """Update the radio connection state and notify the listener when it changes."""
+        if connected == self.radio_connected.is_set():
+            return
+        if connected:
+            self.radio_connected.set()
+        else:
+            self.radio_connected.clear()
+        if self.on_radio_state:
+            self.on_radio_state(connected)
 
     async def connect_to_radio(self) -> bool:
         """Establish connection to the radio."""
@@ -223,11 +331,12 @@ class MultiClientProxy:
                 timeout=10.0
             )
             logger.info(f"Connected to radio at {self.radio_host}:{self.radio_port}")
+            _tune_socket(self.radio_writer, self.tcp_nodelay, self.sndbuf, self.rcvbuf)
 
             # Send initialization request to start receiving messages
             await self._send_want_config()
 
-            self.radio_connected.set()
+            self._set_radio_connected(True)
             return True
         except asyncio.TimeoutError:
             logger.error(f"Timeout connecting to radio")
@@ -238,136 +347,174 @@ class MultiClientProxy:
 
     async def _send_want_config(self) -> None:
         """Send want_config request to start receiving radio messages."""
+        if not self._want_config_frame:
+            logger.warning("Meshtastic protobuf not available - skipping want_config")
+            return
         try:
-            from meshtastic import mesh_pb2
-
             # Request config to start receiving messages
-            to_radio = mesh_pb2.ToRadio()
-            to_radio.want_config_id = random.randint(1, 0xFFFFFFFF)
-
-            payload = to_radio.SerializeToString()
-            header = MESHTASTIC_MAGIC + struct.pack('>H', len(payload))
-            frame = header + payload
-
-            self.radio_writer.write(frame)
+            self.radio_writer.write(self._want_config_frame)
             await self.radio_writer.drain()
-            logger.info(f"Sent want_config request to radio (config_id={to_radio.want_config_id})")
+            logger.info(f"Sent want_config request to radio (config_id={self._want_config_id})")
 
-        except ImportError:
-            logger.warning("Meshtastic protobuf not available - skipping want_config")
         except Exception as e:
             logger.error(f"Failed to send want_config: {e}")
 
     async def reconnect_to_radio(self) -> None:
         """Attempt to reconnect to radio with backoff."""
-        self.radio_connected.clear()
+        self._set_radio_connected(False)
         backoff = 1
         while self.running:
             logger.info(f"Attempting radio reconnection in {backoff}s...")
             await asyncio.sleep(backoff)
+            if not self.running:
+                return
             if await self.connect_to_radio():
                 return
             backoff = min(backoff * 2, 30)
 
     async def broadcast_to_clients(self, data: bytes, exclude_id: Optional[int] = None) -> None:
-        """Send data to all connected clients."""
-        async with self.clients_lock:
-            disconnected = []
-            for client_id, client in self.clients.items():
-                if exclude_id and client_id == exclude_id:
-                    continue
-                try:
-                    client.writer.write(data)
-                    await client.writer.drain()
-                except Exception as e:
-                    logger.warning(f"Failed to send to client {client.address}: {e}")
-                    disconnected.append(client_id)
-
-            # Clean up disconnected clients
-            for client_id in disconnected:
-                await self._remove_client(client_id)
+        """Queue data for all connected clients; each client's writer task sends it."""
+        # The dict is only touched from the event loop, so no lock is needed
+        targets = [c for cid, c in tuple(self.clients.items()) if cid != exclude_id]
+        if any(c.queue.full() for c in targets):
+            # Bursts of buffered frames don't yield; give the writer tasks a turn first
+            await asyncio.sleep(0)
+        for client in targets:
+            if client.queue.full():
+                # Slow client - drop its oldest frame rather than stall everyone else
+                client.queue.get_nowait()
+                logger.debug("Client %d backlog full, dropped oldest frame", client.id)
+            client.queue.put_nowait(data)
+
+    async def _client_writer_loop(self, client: ClientConnection) -> None:
+        """Send queued frames to one client until it disconnects."""
+        try:
+            while True:
+                frames = [await client.queue.get()]
+                # Send whatever else queued up behind it in one vectored write and a single drain
+                while not client.queue.empty():
+                    frames.append(client.queue.get_nowait())
+                client.writer.writelines(frames)
+                await client.writer.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send to client {client.address}: {e}")
+            await self._remove_client(client.id)
 
     async def send_to_radio(self, data: bytes) -> bool:
         """Send data to the radio."""
-        async with self.radio_lock:
-            if not self.radio_writer:
-                logger.warning("Radio not connected, cannot send")
-                return False
-            try:
-                self.radio_writer.write(data)
-                await self.radio_writer.drain()
-                return True
-            except Exception as e:
-                logger.error(f"Failed to send to radio: {e}")
-                return False
-
-    def try_parse_text_message(self, payload: bytes) -> Optional[tuple]:
-        """Try to parse a text message from payload using protobuf."""
+        # write() queues the whole frame in one call, so concurrent senders
+        # cannot interleave mid-frame and no lock is needed across drain()
+        writer = self.radio_writer
+        if not writer:
+            logger.warning("Radio not connected, cannot send")
+            return False
         try:
-            from meshtastic import mesh_pb2, portnums_pb2
+            writer.write(data)
+            await writer.drain()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send to radio: {e}")
+            return False
 
-            # Try to parse as ToRadio (client -> radio)
-            to_radio = mesh_pb2.ToRadio()
-            try:
-                to_radio.ParseFromString(payload)
-                if to_radio.HasField('packet'):
-                    packet = to_radio.packet
-                    if packet.HasField('decoded'):
-                        if packet.decoded.portnum == portnums_pb2.TEXT_MESSAGE_APP:
-                            text = packet.decoded.payload.decode('utf-8', errors='ignore')
-                            # Use 'from' field as sender ID (hex node ID)
-                            # Note: 'from' is a Python keyword, so use getattr
-                            from_id = getattr(packet, 'from', 0)
-                            sender_id = f"!{from_id:08x}" if from_id else "client"
-                            channel = packet.channel
-                            # Log full packet details for debugging
-                            logger.info(f"Parsed ToRadio packet:")
-                            logger.info(f"  - from: 0x{from_id:08x}")
-                            logger.info(f"  - to: 0x{packet.to:08x}")
-                            logger.info(f"  - channel: {channel}")
-                            logger.info(f"  - id: {packet.id}")
-                            logger.info(f"  - hop_limit: {packet.hop_limit}")
-                            logger.info(f"  - want_ack: {packet.want_ack}")
-                            return (sender_id, channel, text)
-            except Exception as e:
-                logger.debug(f"ToRadio parse failed: {e}")
+    def _parse_to_radio(self, payload: bytes):
+        """Parse a client payload as ToRadio, or return None if it is not one."""
+        if not _PB_OK:
+            return None
+        to_radio = mesh_pb2.ToRadio()
+        try:
+            to_radio.ParseFromString(payload)
+        except Exception as e:
+            logger.debug("ToRadio parse failed: %s", e)
+            return None
+        return to_radio
 
-            # Try to parse as FromRadio (radio -> client)
-            from_radio = mesh_pb2.FromRadio()
-            try:
-                from_radio.ParseFromString(payload)
-                if from_radio.HasField('packet'):
-                    packet = from_radio.packet
-                    if packet.HasField('decoded'):
-                        if packet.decoded.portnum == portnums_pb2.TEXT_MESSAGE_APP:
-                            text = packet.decoded.payload.decode('utf-8', errors='ignore')
-                            # Use 'from' field as sender ID (hex node ID)
-                            # Note: protobuf field 'from' is accessed via getattr due to Python keyword
-                            from_id = getattr(packet, 'from', 0)
-                            sender_id = f"!{from_id:08x}" if from_id else "unknown"
-                            channel = packet.channel
-                            logger.debug(f"Parsed FromRadio text message from {sender_id}: {text}")
-                            return (sender_id, channel, text)
-            except Exception as e:
-                logger.debug(f"FromRadio parse failed: {e}")
+    def _parse_from_radio(self, payload: bytes):
+        """Parse a radio payload as FromRadio, or return None if it is not one."""
+        if not _PB_OK:
+            return None
+        from_radio = mesh_pb2.FromRadio()
+        try:
+            from_radio.ParseFromString(payload)
+        except Exception as e:
+            logger.debug("[Radio] Failed to decode FromRadio: %s", e)
+            return None
+        return from_radio
 
+    def _extract_text_to_radio(self, to_radio) -> Optional[tuple]:
+        """Return (sender_id, channel, text) for a parsed ToRadio text packet."""
+        if not to_radio.HasField('packet'):
             return None
-        except ImportError:
-            logger.warning("Meshtastic protobuf not available for parsing")
+        packet = to_radio.packet
+        if not packet.HasField('decoded') or packet.decoded.portnum != _TEXT_APP:
             return None
-        except Exception as e:
-            logger.debug(f"Failed to parse message: {e}")
+        text = packet.decoded.payload.decode('utf-8', errors='ignore')
+        # Use 'from' field as sender ID (hex node ID)
+        # Note: 'from' is a Python keyword, so use getattr
+        from_id = getattr(packet, 'from', 0)
+        sender_id = f"!{from_id:08x}" if from_id else "client"
+        channel = packet.channel
+        # Log full packet details for debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parsed ToRadio packet from=0x%08x to=0x%08x ch=%d id=%d hop=%d ack=%s",
+                         from_id, packet.to, channel, packet.id, packet.hop_limit, packet.want_ack)
+        return (sender_id, channel, text)
+
+    def _extract_text_from_radio(self, from_radio) -> Optional[tuple]:
+        """Return (sender_id, channel, text) for a parsed FromRadio text packet."""
+        if not from_radio.HasField('packet'):
             return None
+        packet = from_radio.packet
+        if not packet.HasField('decoded') or packet.decoded.portnum != _TEXT_APP:
+            return None
+        text = packet.decoded.payload.decode('utf-8', errors='ignore')
+        # Use 'from' field as sender ID (hex node ID)
+        # Note: protobuf field 'from' is accessed via getattr due to Python keyword
+        from_id = getattr(packet, 'from', 0)
+        sender_id = f"!{from_id:08x}" if from_id else "unknown"
+        channel = packet.channel
+        logger.debug("Parsed FromRadio text message from %s: %s", sender_id, text)
+        return (sender_id, channel, text)
 
     def _generate_packet_id(self) -> int:
         """Generate a unique packet ID."""
-        return random.randint(1, 0xFFFFFFFF)
+        packet_id = (_id_base ^ next(_id_counter)) & 0xFFFFFFFF
+        # 0 is not a valid packet ID
+        return packet_id or self._generate_packet_id()
+
+    def _build_text_frames(self, text: str, channel: int) -> tuple:
+        """
+        Build a broadcast text packet and frame it for both directions.
+        Returns (mesh_packet, radio_frame, client_frame); the packet is serialized once.
+        """
+        mesh_packet = mesh_pb2.MeshPacket()
+        mesh_packet.id = self._generate_packet_id()
+        mesh_packet.to = 0xFFFFFFFF  # Broadcast
+        mesh_packet.channel = channel
+        mesh_packet.want_ack = True
+        mesh_packet.hop_limit = 7
+        mesh_packet.decoded.portnum = _TEXT_APP
+        mesh_packet.decoded.payload = text.encode('utf-8')
+
+        packet_bytes = mesh_packet.SerializeToString()
+        radio_frame = _wrap_packet(_TO_RADIO_PACKET_TAG, packet_bytes)
+        # FromRadio copy lets clients see the message even if the radio doesn't echo it
+        client_frame = _wrap_packet(_FROM_RADIO_PACKET_TAG, packet_bytes)
+        return mesh_packet, radio_frame, client_frame
+
+    async def _answer_gem(self, sender_id: str, text: str, channel: int) -> None:
+        """Ask Gemini about a /gem command and send the answer on the given channel."""
+        response = await self.gemini.process_message(sender_id, text)
+        if response:
+            await self.send_ai_response(response, channel=channel)
 
     async def send_ai_response(self, text: str, channel: int = None) -> None:
         """Send AI response through the radio and to connected clients."""
+        if not _PB_OK:
+            logger.error("Meshtastic protobuf not available - cannot send AI response")
+            return
         try:
-            from meshtastic import mesh_pb2, portnums_pb2
-
             # Delay to let radio finish transmitting any pending message
             # LoRa transmission can take 1-3+ seconds depending on settings
             if self.response_delay > 0:
@@ -378,36 +525,15 @@ class MultiClientProxy:
             use_channel = channel if channel is not None else self.channel_index
             logger.info(f"Sending AI response on channel {use_channel}: {trimmed[:50]}...")
 
-            # Generate unique packet ID
-            packet_id = self._generate_packet_id()
-
-            # Create protobuf message for radio (ToRadio)
-            mesh_packet = mesh_pb2.MeshPacket()
-            mesh_packet.id = packet_id
-            mesh_packet.to = 0xFFFFFFFF  # Broadcast
-            mesh_packet.channel = use_channel
-            mesh_packet.want_ack = True
-            mesh_packet.hop_limit = 7
-            mesh_packet.decoded.portnum = portnums_pb2.TEXT_MESSAGE_APP
-            mesh_packet.decoded.payload = trimmed.encode('utf-8')
-
-            to_radio = mesh_pb2.ToRadio()
-            to_radio.packet.CopyFrom(mesh_packet)
-
-            payload = to_radio.SerializeToString()
-            header = MESHTASTIC_MAGIC + struct.pack('>H', len(payload))
-            frame = header + payload
+            mesh_packet, frame, client_frame = self._build_text_frames(trimmed, use_channel)
 
             # Log detailed packet info for debugging
-            logger.info(f"AI response packet details:")
-            logger.info(f"  - id: {packet_id}")
-            logger.info(f"  - to: 0x{mesh_packet.to:08x}")
-            logger.info(f"  - channel: {use_channel}")
-            logger.info(f"  - hop_limit: {mesh_packet.hop_limit}")
-            logger.info(f"  - want_ack: {mesh_packet.want_ack}")
-            logger.info(f"  - portnum: {mesh_packet.decoded.portnum}")
-            logger.info(f"  - payload len: {len(mesh_packet.decoded.payload)}")
-            logger.debug(f"  - raw frame hex: {frame.hex()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("AI response packet id=%d to=0x%08x ch=%d hop=%d ack=%s port=%d len=%d",
+                             mesh_packet.id, mesh_packet.to, use_channel, mesh_packet.hop_limit,
+                             mesh_packet.want_ack, mesh_packet.decoded.portnum,
+                             len(mesh_packet.decoded.payload))
+                logger.debug("AI response raw frame hex: %s", frame.hex())
 
             # Send to radio
             if await self.send_to_radio(frame):
@@ -415,15 +541,8 @@ class MultiClientProxy:
             else:
                 logger.error("Failed to send AI response to radio")
 
-            # Also create a FromRadio message to send directly to clients
+            # Also send the FromRadio copy directly to clients
             # This ensures clients see the response even if radio doesn't echo it
-            from_radio = mesh_pb2.FromRadio()
-            from_radio.packet.CopyFrom(mesh_packet)
-
-            client_payload = from_radio.SerializeToString()
-            client_header = MESHTASTIC_MAGIC + struct.pack('>H', len(client_payload))
-            client_frame = client_header + client_payload
-
             await self.broadcast_to_clients(client_frame)
             logger.info(f"AI response broadcast to clients ({len(client_frame)} bytes)")
 
@@ -432,16 +551,15 @@ class MultiClientProxy:
                 await self.telegram.send_radio_message("Gemini AI", trimmed)
                 logger.info(f"AI response forwarded to Telegram")
 
-        except ImportError as e:
-            logger.error(f"Meshtastic protobuf not available: {e}")
         except Exception as e:
             logger.error(f"Failed to send AI response: {e}")
 
     async def _send_telegram_message_to_radio(self, text: str) -> None:
         """Send a message from Telegram to the radio."""
+        if not _PB_OK:
+            logger.error("Meshtastic protobuf not available - cannot send Telegram message to radio")
+            return
         try:
-            from meshtastic import mesh_pb2, portnums_pb2
-
             logger.info(f"Sending Telegram message to radio: {text[:50]}...")
 
             # Trim message if too long
@@ -462,31 +580,11 @@ class MultiClientProxy:
                     sender_id = "telegram_user"
 
                 logger.info(f"[Telegram] Processing /gem command from {sender_id}")
-                response = self.gemini.process_message(sender_id, original_command)
-                if response:
-                    # Send AI response on the bot messages channel
-                    asyncio.create_task(self.send_ai_response(response, channel=self.channel_index))
+                # Send AI response on the bot messages channel
+                self._spawn(self._answer_gem(sender_id, original_command, self.channel_index))
                 # Continue to forward the original /gem message below
 
-            # Generate unique packet ID
-            packet_id = self._generate_packet_id()
-
-            # Create protobuf message for radio (ToRadio)
-            mesh_packet = mesh_pb2.MeshPacket()
-            mesh_packet.id = packet_id
-            mesh_packet.to = 0xFFFFFFFF  # Broadcast
-            mesh_packet.channel = self.channel_index
-            mesh_packet.want_ack = True
-            mesh_packet.hop_limit = 7
-            mesh_packet.decoded.portnum = portnums_pb2.TEXT_MESSAGE_APP
-            mesh_packet.decoded.payload = trimmed.encode('utf-8')
-
-            to_radio = mesh_pb2.ToRadio()
-            to_radio.packet.CopyFrom(mesh_packet)
-
-            payload = to_radio.SerializeToString()
-            header = MESHTASTIC_MAGIC + struct.pack('>H', len(payload))
-            frame = header + payload
+            _, frame, client_frame = self._build_text_frames(trimmed, self.channel_index)
 
             # Send to radio
             if await self.send_to_radio(frame):
@@ -495,64 +593,53 @@ class MultiClientProxy:
                 logger.error("Failed to send Telegram message to radio")
 
             # Also broadcast to connected clients so they see the Telegram message
-            from_radio = mesh_pb2.FromRadio()
-            from_radio.packet.CopyFrom(mesh_packet)
-
-            client_payload = from_radio.SerializeToString()
-            client_header = MESHTASTIC_MAGIC + struct.pack('>H', len(client_payload))
-            client_frame = client_header + client_payload
-
             await self.broadcast_to_clients(client_frame)
             logger.info(f"Telegram message broadcast to clients ({len(client_frame)} bytes)")
 
-        except ImportError as e:
-            logger.error(f"Meshtastic protobuf not available: {e}")
         except Exception as e:
             logger.error(f"Failed to send Telegram message to radio: {e}")
 
-    async def handle_client_data(self, client: ClientConnection, data: bytes) -> None:
-        """Process data from a client and forward to radio."""
-        parser = MeshtasticProtocolParser()
-        frames = parser.add_data(data)
+    async def handle_client_data(self, client: ClientConnection, raw_frame: bytes, payload: bytes) -> None:
+        """Process a frame from a client and forward it to the radio."""
+        to_radio = self._parse_to_radio(payload)
+        parsed = self._extract_text_to_radio(to_radio) if to_radio is not None else None
+        if parsed:
+            sender_id, channel, text = parsed
+            logger.info("[Client %d→Radio] Forwarding message on ch%d: %.50s...", client.id, channel, text)
 
-        for raw_frame, payload in frames:
-            parsed = self.try_parse_text_message(payload)
-            if parsed:
-                sender_id, channel, text = parsed
-                logger.info(f"[Client {client.id}→Radio] Forwarding message on ch{channel}: {text[:50]}...")
-
-                # Forward to Telegram if enabled
-                if self.telegram and self.telegram.running:
-                    asyncio.create_task(
-                        self.telegram.send_radio_message(f"Client-{sender_id}", text)
-                    )
+            # Forward to Telegram if enabled
+            if self.telegram and self.telegram.running:
+                await self.telegram.send_radio_message(f"Client-{sender_id}", text)
 
-                if text.startswith('/gem'):
-                    response = self.gemini.process_message(sender_id, text)
-                    if response:
-                        # Pass the channel so response goes to same channel
-                        asyncio.create_task(self.send_ai_response(response, channel=channel))
+            if text.startswith('/gem'):
+                # Pass the channel so response goes to same channel
+                self._spawn(self._answer_gem(sender_id, text, channel))
 
-        # Forward raw data to radio (preserves channel)
-        await self.send_to_radio(data)
-        logger.debug(f"[Client {client.id}→Radio] Forwarded {len(data)} bytes of raw data to radio (channel preserved)")
+        # Forward raw frame to radio (preserves channel)
+        await self.send_to_radio(raw_frame)
+        logger.debug("[Client %d→Radio] Forwarded %d byte frame to radio (channel preserved)", client.id, len(raw_frame))
 
     async def handle_client(self,
                            reader: asyncio.StreamReader,
                            writer: asyncio.StreamWriter) -> None:
         """Handle a new client connection."""
+        # The server creates this task, so register it for stop() to cancel
+        self._track(asyncio.current_task())
         addr = writer.get_extra_info('peername')
-
-        async with self.clients_lock:
-            self.client_id_counter += 1
-            client_id = self.client_id_counter
-            client = ClientConnection(
-                reader=reader,
-                writer=writer,
-                address=f"{addr[0]}:{addr[1]}",
-                id=client_id
-            )
-            self.clients[client_id] = client
+        _tune_socket(writer, self.tcp_nodelay, self.sndbuf, self.rcvbuf)
+
+        self.client_id_counter += 1
+        client_id = self.client_id_counter
+        client = ClientConnection(
+            reader=reader,
+            writer=writer,
+            address=f"{addr[0]}:{addr[1]}",
+            id=client_id
+        )
+        client.writer_task = asyncio.create_task(self._client_writer_loop(client))
+        self.clients[client_id] = client
+        if self.on_client_change:
+            self.on_client_change(client_id, client.address, True)
 
         client_count = len(self.clients)
         logger.info(f"Client {client.id} connected from {client.address} (total: {client_count})")
@@ -562,18 +649,16 @@ class MultiClientProxy:
             await self.radio_connected.wait()
 
             while self.running:
-                try:
-                    data = await asyncio.wait_for(reader.read(4096), timeout=60.0)
-                    if not data:
-                        break
-
-                    logger.debug(f"[Client {client.id}] Received {len(data)} bytes")
-                    await self.handle_client_data(client, data)
-
-                except asyncio.TimeoutError:
-                    # Keep-alive check, continue
-                    continue
-
+                raw_frame, payload = await _read_frame(reader)
+                logger.debug("[Client %d] Received %d byte frame", client.id, len(raw_frame))
+                await self.handle_client_data(client, raw_frame, payload)
+
+        except asyncio.IncompleteReadError:
+            pass
+        except asyncio.CancelledError:
+            # stop() cancelled us; end normally since asyncio's stream callback
+            # calls exception() on this task and would log the cancellation
+            pass
         except Exception as e:
             logger.error(f"Client {client.id} error: {e}")
         finally:
@@ -582,76 +667,66 @@ class MultiClientProxy:
 
     async def _remove_client(self, client_id: int) -> None:
         """Remove a client connection."""
-        async with self.clients_lock:
-            if client_id in self.clients:
-                client = self.clients.pop(client_id)
-                try:
-                    client.writer.close()
-                    await client.writer.wait_closed()
-                except:
-                    pass
-                logger.info(f"Client {client_id} removed (remaining: {len(self.clients)})")
-
-    async def handle_radio_data(self, data: bytes) -> None:
-        """Process data from radio, check for /gem commands, and broadcast to clients."""
-        parser = MeshtasticProtocolParser()
-        frames = parser.add_data(data)
-
-        for raw_frame, payload in frames:
-            # Try to decode all FromRadio messages for debugging
-            self._debug_from_radio(payload)
-
-            parsed = self.try_parse_text_message(payload)
+        client = self.clients.pop(client_id, None)
+        if client:
+            if self.on_client_change:
+                self.on_client_change(client_id, client.address, False)
+            if client.writer_task and client.writer_task is not asyncio.current_task():
+                client.writer_task.cancel()
+            try:
+                client.writer.close()
+            except:
+                pass
+            # Don't hold up the caller on the TCP close handshake
+            self._spawn(_wait_closed(client.writer))
+            logger.info(f"Client {client_id} removed (remaining: {len(self.clients)})")
+
+    async def handle_radio_data(self, raw_frame: bytes, payload: bytes) -> None:
+        """Process a frame from radio, check for /gem commands, and broadcast to clients."""
+        from_radio = self._parse_from_radio(payload)
+        if from_radio is not None:
+            # Log every FromRadio message for debugging
+            self._log_from_radio(from_radio)
+
+            parsed = self._extract_text_from_radio(from_radio)
             if parsed:
                 sender_id, channel, text = parsed
-                logger.info(f"[Radio→Clients] Forwarding message from ch{channel}: {text[:50]}...")
+                logger.info("[Radio→Clients] Forwarding message from ch%d: %.50s...", channel, text)
 
                 # Forward to Telegram if enabled
                 if self.telegram and self.telegram.running:
-                    asyncio.create_task(
-                        self.telegram.send_radio_message(f"Node-{sender_id}", text)
-                    )
+                    await self.telegram.send_radio_message(f"Node-{sender_id}", text)
 
                 # Check for /gem command from radio
                 if text.startswith('/gem'):
                     logger.info(f"[Radio] Processing /gem command from {sender_id} on ch{channel}")
-                    response = self.gemini.process_message(sender_id, text)
-                    if response:
-                        # Pass the channel so response goes to same channel
-                        asyncio.create_task(self.send_ai_response(response, channel=channel))
-
-        # Broadcast raw data to all connected clients (preserves channel)
-        await self.broadcast_to_clients(data)
-        logger.debug(f"[Radio→Clients] Broadcast {len(data)} bytes of raw data to all clients (channel preserved)")
-
-    def _debug_from_radio(self, payload: bytes) -> None:
-        """Debug helper to decode and log FromRadio messages."""
-        try:
-            from meshtastic import mesh_pb2
-
-            from_radio = mesh_pb2.FromRadio()
-            from_radio.ParseFromString(payload)
-
-            # Log what type of FromRadio message this is
-            if from_radio.HasField('packet'):
-                pkt = from_radio.packet
-                from_id = getattr(pkt, 'from', 0)
-                logger.info(f"[Radio] FromRadio packet: from=0x{from_id:08x} to=0x{pkt.to:08x} ch={pkt.channel} id={pkt.id}")
-            elif from_radio.HasField('my_info'):
-                logger.info(f"[Radio] FromRadio my_info: node_num={from_radio.my_info.my_node_num}")
-            elif from_radio.HasField('node_info'):
-                logger.info(f"[Radio] FromRadio node_info: num={from_radio.node_info.num}")
-            elif from_radio.HasField('config_complete_id'):
-                logger.info(f"[Radio] FromRadio config_complete: id={from_radio.config_complete_id}")
-            elif from_radio.HasField('rebooted'):
-                logger.info(f"[Radio] FromRadio rebooted: {from_radio.rebooted}")
-            elif from_radio.HasField('queueStatus'):
-                qs = from_radio.queueStatus
-                logger.info(f"[Radio] FromRadio queueStatus: res={qs.res} free={qs.free} maxlen={qs.maxlen} mesh_packet_id={qs.mesh_packet_id}")
-            else:
-                logger.debug(f"[Radio] FromRadio other: {from_radio}")
-        except Exception as e:
-            logger.debug(f"[Radio] Failed to decode FromRadio: {e}")
+                    # Pass the channel so response goes to same channel
+                    self._spawn(self._answer_gem(sender_id, text, channel))
+
+        # Broadcast raw frame to all connected clients (preserves channel)
+        await self.broadcast_to_clients(raw_frame)
+        logger.debug("[Radio→Clients] Broadcast %d byte frame to all clients (channel preserved)", len(raw_frame))
+
+    def _log_from_radio(self, from_radio) -> None:
+        """Debug helper to log an already parsed FromRadio message."""
+        # Log what type of FromRadio message this is
+        if from_radio.HasField('packet'):
+            pkt = from_radio.packet
+            from_id = getattr(pkt, 'from', 0)
+            logger.info("[Radio] FromRadio packet: from=0x%08x to=0x%08x ch=%d id=%d", from_id, pkt.to, pkt.channel, pkt.id)
+        elif from_radio.HasField('my_info'):
+            logger.info("[Radio] FromRadio my_info: node_num=%d", from_radio.my_info.my_node_num)
+        elif from_radio.HasField('node_info'):
+            logger.info("[Radio] FromRadio node_info: num=%d", from_radio.node_info.num)
+        elif from_radio.HasField('config_complete_id'):
+            logger.info("[Radio] FromRadio config_complete: id=%d", from_radio.config_complete_id)
+        elif from_radio.HasField('rebooted'):
+            logger.info("[Radio] FromRadio rebooted: %s", from_radio.rebooted)
+        elif from_radio.HasField('queueStatus'):
+            qs = from_radio.queueStatus
+            logger.info("[Radio] FromRadio queueStatus: res=%d free=%d maxlen=%d mesh_packet_id=%d", qs.res, qs.free, qs.maxlen, qs.mesh_packet_id)
+        else:
+            logger.debug("[Radio] FromRadio other: %s", from_radio)
 
     async def radio_reader_task(self) -> None:
         """Read from radio, intercept /gem commands, and broadcast to all clients."""
@@ -664,20 +739,18 @@ class MultiClientProxy:
                     await asyncio.sleep(0.1)
                     continue
 
-                data = await self.radio_reader.read(4096)
-                if not data:
-                    logger.warning("Radio connection closed")
-                    self.radio_connected.clear()
-                    asyncio.create_task(self.reconnect_to_radio())
-                    continue
-
-                logger.info(f"[Radio RX] Received {len(data)} bytes from radio")
-                await self.handle_radio_data(data)
+                raw_frame, payload = await _read_frame(self.radio_reader)
+                logger.info("[Radio RX] Received %d byte frame from radio", len(raw_frame))
+                await self.handle_radio_data(raw_frame, payload)
 
+            except asyncio.IncompleteReadError:
+                logger.warning("Radio connection closed")
+                self._set_radio_connected(False)
+                self._spawn(self.reconnect_to_radio())
             except Exception as e:
                 logger.error(f"Radio reader error: {e}")
-                self.radio_connected.clear()
-                asyncio.create_task(self.reconnect_to_radio())
+                self._set_radio_connected(False)
+                self._spawn(self.reconnect_to_radio())
 
     async def start(self) -> None:
         """Start the proxy server."""
@@ -698,7 +771,7 @@ class MultiClientProxy:
             raise Exception(f"Could not connect to radio at {self.radio_host}:{self.radio_port}")
 
         # Start radio reader task
-        radio_task = asyncio.create_task(self.radio_reader_task())
+        radio_task = self._spawn(self.radio_reader_task())
 
         # Start Telegram bot if configured
         if self.telegram:
@@ -707,10 +780,15 @@ class MultiClientProxy:
                 logger.warning("Telegram bot failed to start, continuing without Telegram integration")
 
         # Start client server
+        reuse_port = self.reuse_port
+        if reuse_port and not hasattr(socket, 'SO_REUSEPORT'):
+            logger.warning("SO_REUSEPORT is not supported on this platform, ignoring")
+            reuse_port = False
         self.server = await asyncio.start_server(
             self.handle_client,
             self.listen_host,
-            self.listen_port
+            self.listen_port,
+            reuse_port=reuse_port or None
         )
 
         addr = self.server.sockets[0].getsockname()
@@ -748,28 +826,42 @@ class MultiClientProxy:
         logger.info("Stopping proxy...")
         self.running = False
 
+        # Cancel what the proxy started: radio reader, reconnects, /gem answers, client handlers
+        current = asyncio.current_task()
+        tasks = [t for t in self._tasks if t is not current]
+        for task in tasks:
+            task.cancel()
+
         # Stop Telegram bot
         if self.telegram:
             await self.telegram.stop()
 
-        # Close server
+        # Stop accepting new clients
+        if self.server:
+            self.server.close()
+
+        # Close all clients and wait for them in parallel
+        clients = tuple(self.clients.values())
+        for client in clients:
+            if client.writer_task:
+                client.writer_task.cancel()
+            try:
+                client.writer.close()
+            except:
+                pass
+        await asyncio.gather(*(_wait_closed(c.writer) for c in clients))
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Close server (waits for client connections on newer Pythons, so after the clients)
         if self.server:
             try:
-                self.server.close()
                 await self.server.wait_closed()
                 logger.info("Server stopped")
             except Exception as e:
                 logger.error(f"Error stopping server: {e}")
 
-        # Close all clients
-        async with self.clients_lock:
-            for client in self.clients.values():
-                try:
-                    client.writer.close()
-                except:
-                    pass
-
         # Close radio connection
+        self._set_radio_connected(False)
         if self.radio_writer:
             try:
                 self.radio_writer.close()
@@ -778,6 +870,9 @@ class MultiClientProxy:
             except:
                 pass
 
+        # Release the AI handler's worker tasks and cache connection
+        self.gemini.close()
+
 
 async def main():
     parser = argparse.ArgumentParser(
@@ -795,6 +890,14 @@ async def main():
                        help=f'Channel index for AI responses (default: {DEFAULT_CHANNEL_INDEX})')
     parser.add_argument('--response-delay', type=float, default=DEFAULT_RESPONSE_DELAY,
                        help=f'Delay in seconds before sending AI response (default: {DEFAULT_RESPONSE_DELAY})')
+    parser.add_argument('--no-tcp-nodelay', action='store_true',
+                       help='Clear TCP_NODELAY (asyncio sets it by default) so Nagle\'s algorithm batches small writes')
+    parser.add_argument('--reuse-port', action='store_true',
+                       help='Set SO_REUSEPORT on the listening socket')
+    parser.add_argument('--sndbuf-kb', type=int, default=0,
+                       help='Socket send buffer size in KB (default: OS default)')
+    parser.add_argument('--rcvbuf-kb', type=int, default=0,
+                       help='Socket receive buffer size in KB (default: OS default)')
     parser.add_argument('--debug', action='store_true',
                        help='Enable debug logging')
 
@@ -809,7 +912,11 @@ async def main():
         radio_host=args.radio_host,
         radio_port=args.radio_port,
         channel_index=args.channel,
-        response_delay=args.response_delay
+        response_delay=args.response_delay,
+        tcp_nodelay=not args.no_tcp_nodelay,
+        reuse_port=args.reuse_port,
+        sndbuf=args.sndbuf_kb * 1024,
+        rcvbuf=args.rcvbuf_kb * 1024
     )
 
     try:
@@ -823,4 +930,11 @@ async def main():
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    if hasattr(asyncio, 'Runner'):
+        with asyncio.Runner(loop_factory=new_event_loop) as runner:
+            runner.run(main())
+    else:
+        # Python < 3.11 has no Runner, so hand uvloop to asyncio.run through the loop policy
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(main())
@@ -19,148 +19,98 @@ sys.path.insert(0, os.path.dirname(application_path))
 
 import asyncio
 import logging
-from datetime import datetime
+import logging.handlers
+import queue
+import time
+from collections import deque
 from typing import Optional
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QLineEdit, QTextEdit, QSpinBox, QDoubleSpinBox,
-    QGroupBox, QListWidget, QCheckBox, QComboBox, QSplitter, QStatusBar
+    QPushButton, QLabel, QLineEdit, QPlainTextEdit, QSpinBox, QDoubleSpinBox,
+    QGroupBox, QListWidget, QListWidgetItem, QCheckBox, QComboBox, QSplitter, QStatusBar
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSettings
-from PyQt6.QtGui import QFont, QPalette, QColor, QTextCursor
-import threading
+from PyQt6.QtCore import Qt, QTimer, QSettings, QMetaObject, pyqtSlot
+from PyQt6.QtGui import QFont, QPalette, QColor
+import qasync
 
 # Import the proxy
 from multi_client_proxy import MultiClientProxy
 
 
-class QTextEditLogger(logging.Handler):
-    """Custom logging handler that emits to Qt signal."""
+logger = logging.getLogger(__name__)
 
-    def __init__(self, signal):
-        super().__init__()
-        self.signal = signal
-
-    def emit(self, record):
-        msg = self.format(record)
-        self.signal.emit(msg)
+LOG_MAX_LINES = 5000  # Older log lines are dropped from the viewer
 
 
-class ProxyThread(QThread):
-    """Thread to run the async proxy."""
+class BatchingHandler(logging.Handler):
+    """
+    Logging handler that buffers formatted lines for the GUI to collect in batches.
+    notify() is called once when the first line of a new batch arrives.
+    """
 
-    log_signal = pyqtSignal(str)
-    status_signal = pyqtSignal(str)
-    client_count_signal = pyqtSignal(int)
-
-    def __init__(self, config):
+    def __init__(self, notify):
         super().__init__()
-        self.config = config
-        self.proxy = None
-        self.loop = None
-        self.running = False
-
-    def run(self):
-        """Run the proxy in this thread."""
-        self.running = True
-
-        # Create new event loop for this thread
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-
-        # Set up Gemini API key if provided
-        if self.config.get('gemini_api_key'):
-            os.environ['GEMINI_API_KEY'] = self.config['gemini_api_key']
-
-        # Set SSL verification flag
-        if self.config.get('disable_ssl_verify'):
-            os.environ['DISABLE_SSL_VERIFY'] = 'true'
-        else:
-            os.environ.pop('DISABLE_SSL_VERIFY', None)
-
-        # Create proxy instance with ready callback
-        def on_proxy_ready():
-            self.status_signal.emit("Running")
-
-        self.proxy = MultiClientProxy(
-            listen_host=self.config['listen_host'],
-            listen_port=self.config['listen_port'],
-            radio_host=self.config['radio_host'],
-            radio_port=self.config['radio_port'],
-            channel_index=self.config['channel_index'],
-            response_delay=self.config['response_delay'],
-            on_ready_callback=on_proxy_ready,
-            telegram_bot_token=self.config.get('telegram_bot_token') or None,
-            telegram_chat_id=self.config.get('telegram_chat_id') or None
-        )
+        self.lines = deque()
+        self.notify = notify
+        self._pending = False
 
+    def emit(self, record):
+        self.lines.append(self.format(record))
+        if not self._pending:
+            self._pending = True
+            self.notify()
+
+    def drain(self) -> list:
+        """Take all buffered lines (safe to call from another thread)."""
+        # Clear first, so a line added while draining schedules a new batch
+        self._pending = False
+        lines = []
         try:
-            self.status_signal.emit("Starting...")
-            self.loop.run_until_complete(self.proxy.start())
-        except asyncio.CancelledError:
-            self.log_signal.emit("Proxy stopped by user")
-        except Exception as e:
-            self.log_signal.emit(f"ERROR: {e}")
-            self.status_signal.emit("Error")
-        finally:
-            # Clean up all pending tasks
-            try:
-                pending = asyncio.all_tasks(self.loop)
-                for task in pending:
-                    task.cancel()
-                if pending:
-                    self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                self.loop.close()
-            except:
-                pass
-            self.running = False
-            self.status_signal.emit("Stopped")
-
-    def stop(self):
-        """Stop the proxy."""
-        if not self.running:
-            return
-
-        self.running = False
-        self.log_signal.emit("Stopping proxy...")
-
-        if self.proxy and self.loop and not self.loop.is_closed():
-            try:
-                # Create a future to run the stop coroutine
-                future = asyncio.run_coroutine_threadsafe(self.proxy.stop(), self.loop)
-                # Wait for stop to complete (with timeout)
-                future.result(timeout=5.0)
-            except Exception as e:
-                self.log_signal.emit(f"Error during stop: {e}")
-
-            # Cancel all tasks and stop the loop
-            try:
-                self.loop.call_soon_threadsafe(self.loop.stop)
-            except:
-                pass
+            while True:
+                lines.append(self.lines.popleft())
+        except IndexError:
+            return lines
 
 
 class ProxyGUI(QMainWindow):
     """Main GUI window for the Meshtastic Proxy."""
 
-    # Define signals as class attributes
-    log_signal = pyqtSignal(str)
+    # Label styles, applied only when the state they show changes
+    _STATUS_STYLES = {
+        "Running": "font-weight: bold; color: green;",
+        "Stopped": "font-weight: bold; color: red;",
+        "Error": "font-weight: bold; color: orange;",
+    }
+    _STATUS_STYLE_OTHER = "font-weight: bold; color: yellow;"
+    _RADIO_LABELS = {
+        True: ("Radio: Connected", "color: green;"),
+        False: ("Radio: Disconnected", "color: red;"),
+    }
 
     def __init__(self):
         super().__init__()
-        self.proxy_thread = None
+        # The proxy runs as a task on the GUI's own (qasync) event loop
+        self.proxy = None
+        self.proxy_task = None
+        self._stop_task = None
         self.settings = QSettings('Meshtastic', 'ProxyGUI')
         self.start_time = None
         self.message_count = 0
 
+        # Last state shown in the statistics panel, so ticks only touch what changed
+        self._known_clients = {}
+        self._last_radio_connected = None
+        self._last_status = None
+        self._last_uptime = None
+
         self.init_ui()
         self.load_settings()
         self.setup_logging()
 
-        # Timer for statistics updates
+        # Timer for the uptime display, running only while the proxy does
         self.stats_timer = QTimer()
+        self.stats_timer.setInterval(1000)
         self.stats_timer.timeout.connect(self.update_statistics)
-        self.stats_timer.start(1000)
 
     def init_ui(self):
         """Initialize the user interface."""
@@ -257,6 +207,31 @@ class ProxyGUI(QMainWindow):
         ssl_layout.addStretch()
         config_layout.addLayout(ssl_layout)
 
+        # Socket options
+        socket_layout = QHBoxLayout()
+        self.nodelay_check = QCheckBox("TCP_NODELAY")
+        self.nodelay_check.setChecked(True)
+        self.nodelay_check.setToolTip("asyncio sets TCP_NODELAY on every connection; uncheck to let Nagle's algorithm batch small writes")
+        socket_layout.addWidget(self.nodelay_check)
+        self.reuse_port_check = QCheckBox("SO_REUSEPORT")
+        self.reuse_port_check.setToolTip("Allow other processes to listen on the same port")
+        socket_layout.addWidget(self.reuse_port_check)
+        socket_layout.addWidget(QLabel("Send Buf:"))
+        self.sndbuf_input = QSpinBox()
+        self.sndbuf_input.setRange(0, 16384)
+        self.sndbuf_input.setSuffix(" KB")
+        self.sndbuf_input.setSpecialValueText("Default")
+        self.sndbuf_input.setToolTip("Socket send buffer size (Default = OS default)")
+        socket_layout.addWidget(self.sndbuf_input)
+        socket_layout.addWidget(QLabel("Recv Buf:"))
+        self.rcvbuf_input = QSpinBox()
+        self.rcvbuf_input.setRange(0, 16384)
+        self.rcvbuf_input.setSuffix(" KB")
+        self.rcvbuf_input.setSpecialValueText("Default")
+        self.rcvbuf_input.setToolTip("Socket receive buffer size (Default = OS default)")
+        socket_layout.addWidget(self.rcvbuf_input)
+        config_layout.addLayout(socket_layout)
+
         config_group.setLayout(config_layout)
         left_panel.addWidget(config_group)
 
@@ -274,8 +249,8 @@ class ProxyGUI(QMainWindow):
         # Status
         status_layout = QHBoxLayout()
         status_layout.addWidget(QLabel("Status:"))
-        self.status_label = QLabel("Stopped")
-        self.status_label.setStyleSheet("font-weight: bold; color: red;")
+        self.status_label = QLabel()
+        self.update_status("Stopped")
         status_layout.addWidget(self.status_label)
         status_layout.addStretch()
         control_layout.addLayout(status_layout)
@@ -335,10 +310,15 @@ class ProxyGUI(QMainWindow):
         log_controls.addStretch()
         right_panel.addLayout(log_controls)
 
-        # Log viewer
-        self.log_viewer = QTextEdit()
+        # Log viewer; the style hint lets Qt resolve the platform's fixed-pitch
+        # font directly instead of substituting for a missing "Courier"
+        self.log_font = QFont("Monospace", 9)
+        self.log_font.setStyleHint(QFont.StyleHint.TypeWriter)
+        self.log_viewer = QPlainTextEdit()
         self.log_viewer.setReadOnly(True)
-        self.log_viewer.setFont(QFont("Courier", 9))
+        self.log_viewer.setMaximumBlockCount(LOG_MAX_LINES)
+        self.log_viewer.setCenterOnScroll(False)
+        self.log_viewer.setFont(self.log_font)
         right_panel.addWidget(self.log_viewer)
 
         # Combine panels
@@ -469,7 +449,7 @@ class ProxyGUI(QMainWindow):
             QCheckBox::indicator:hover {
                 border: 1px solid #5e5e62;
             }
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #1e1e20;
                 border: 1px solid #3e3e42;
                 border-radius: 3px;
@@ -489,37 +469,56 @@ class ProxyGUI(QMainWindow):
     def setup_logging(self):
         """Set up logging to capture to GUI."""
         # Get root logger
-        logger = logging.getLogger()
-
-        # Create handler
-        handler = QTextEditLogger(self.log_signal)
-        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(handler)
-
-        # Connect signal
-        self.log_signal.connect(self.append_log)
-
+        root = logging.getLogger()
+
+        # Producers only enqueue records; the listener thread formats them into a buffer
+        # and queues one flush per batch, so logging never blocks the proxy event loop
+        self.log_handler = BatchingHandler(self._schedule_log_flush)
+        self.log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        self.log_listener = logging.handlers.QueueListener(log_queue, self.log_handler)
+        self.log_listener.start()
+
+    def _schedule_log_flush(self):
+        """Queue a flush_logs call on the GUI thread (called from the listener thread)."""
+        QMetaObject.invokeMethod(self, "flush_logs", Qt.ConnectionType.QueuedConnection)
+
+    @pyqtSlot()
+    def flush_logs(self):
+        """Append all log lines buffered since the last flush in one update."""
+        lines = self.log_handler.drain()
+        if lines:
+            self.append_log('\n'.join(lines))
+
+    @pyqtSlot(str)
     def change_log_level(self, level):
         """Change the logging level."""
         logging.getLogger().setLevel(getattr(logging, level))
         self.append_log(f"Log level changed to {level}")
 
+    @pyqtSlot(str)
     def append_log(self, message):
         """Append a message to the log viewer."""
-        self.log_viewer.append(message)
-        if self.auto_scroll_check.isChecked():
-            self.log_viewer.moveCursor(QTextCursor.MoveOperation.End)
-
+        # Only follow new output if the user hasn't scrolled up to read older lines
+        scrollbar = self.log_viewer.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        self.log_viewer.appendPlainText(message)
+        if at_bottom and self.auto_scroll_check.isChecked():
+            scrollbar.setValue(scrollbar.maximum())
+
+    @pyqtSlot()
     def clear_logs(self):
         """Clear the log viewer."""
         self.log_viewer.clear()
 
+    @pyqtSlot()
     def toggle_proxy(self):
         """Start or stop the proxy."""
-        if self.proxy_thread is None or not self.proxy_thread.running:
+        if self.proxy_task is None or self.proxy_task.done():
             self.start_proxy()
-        else:
-            self.stop_proxy()
+        elif self._stop_task is None:
+            self._stop_task = asyncio.ensure_future(self.stop_proxy())
 
     def start_proxy(self):
         """Start the proxy server."""
@@ -533,7 +532,11 @@ class ProxyGUI(QMainWindow):
             'gemini_api_key': self.api_key_input.text(),
             'telegram_bot_token': self.telegram_token_input.text(),
             'telegram_chat_id': self.telegram_chat_input.text(),
-            'disable_ssl_verify': self.disable_ssl_check.isChecked()
+            'disable_ssl_verify': self.disable_ssl_check.isChecked(),
+            'tcp_nodelay': self.nodelay_check.isChecked(),
+            'reuse_port': self.reuse_port_check.isChecked(),
+            'sndbuf': self.sndbuf_input.value() * 1024,
+            'rcvbuf': self.rcvbuf_input.value() * 1024
         }
 
         # Save settings
@@ -542,26 +545,79 @@ class ProxyGUI(QMainWindow):
         # Disable config inputs
         self.set_config_enabled(False)
 
-        # Create and start thread
-        self.proxy_thread = ProxyThread(config)
-        self.proxy_thread.log_signal.connect(self.append_log)
-        self.proxy_thread.status_signal.connect(self.update_status)
-        self.proxy_thread.client_count_signal.connect(self.update_client_count)
-        self.proxy_thread.start()
+        # Set up Gemini API key if provided
+        if config.get('gemini_api_key'):
+            os.environ['GEMINI_API_KEY'] = config['gemini_api_key']
+
+        # Set SSL verification flag
+        if config.get('disable_ssl_verify'):
+            os.environ['DISABLE_SSL_VERIFY'] = 'true'
+        else:
+            os.environ.pop('DISABLE_SSL_VERIFY', None)
+
+        self.proxy = MultiClientProxy(
+            listen_host=config['listen_host'],
+            listen_port=config['listen_port'],
+            radio_host=config['radio_host'],
+            radio_port=config['radio_port'],
+            channel_index=config['channel_index'],
+            response_delay=config['response_delay'],
+            on_ready_callback=lambda: self.update_status("Running"),
+            on_radio_state=self.update_radio_status,
+            on_client_change=self.update_client,
+            telegram_bot_token=config.get('telegram_bot_token') or None,
+            telegram_chat_id=config.get('telegram_chat_id') or None,
+            tcp_nodelay=config['tcp_nodelay'],
+            reuse_port=config['reuse_port'],
+            sndbuf=config['sndbuf'],
+            rcvbuf=config['rcvbuf']
+        )
+        self.update_status("Starting...")
+        self.proxy_task = asyncio.ensure_future(self._run_proxy())
 
         self.start_stop_btn.setText("Stop Proxy")
-        self.start_time = datetime.now()
+        self.start_time = time.monotonic()
+        self.stats_timer.start()
 
-    def stop_proxy(self):
-        """Stop the proxy server."""
-        if self.proxy_thread:
-            self.proxy_thread.stop()
-            self.proxy_thread.wait(5000)  # Wait up to 5 seconds
-            self.proxy_thread = None
+    async def _run_proxy(self):
+        """Run the proxy until it stops, then reset the controls."""
+        status = "Stopped"
+        try:
+            await self.proxy.start()
+        except asyncio.CancelledError:
+            logger.info("Proxy stopped by user")
+        except Exception as e:
+            logger.error(f"Proxy error: {e}")
+            status = "Error"
+            # start() can fail after the radio connected (e.g. the listen port is taken);
+            # stop() closes the radio and cancels the tasks it already started
+            try:
+                await asyncio.wait_for(self.proxy.stop(), timeout=5.0)
+            except Exception as stop_err:
+                logger.error(f"Error during stop: {stop_err}")
+        finally:
+            self.update_status(status)
+            self.start_stop_btn.setText("Start Proxy")
+            self.set_config_enabled(True)
+            self.start_time = None
+            self.stats_timer.stop()
+            # Clients dropped by the shutdown may not all have been reported
+            self.clients_list.clear()
+            self._known_clients.clear()
+            self.update_client_count(0)
 
-        self.start_stop_btn.setText("Start Proxy")
-        self.set_config_enabled(True)
-        self.start_time = None
+    async def stop_proxy(self):
+        """Stop the proxy server."""
+        try:
+            if self.proxy_task and not self.proxy_task.done():
+                try:
+                    await asyncio.wait_for(self.proxy.stop(), timeout=5.0)
+                except Exception as e:
+                    logger.error(f"Error during stop: {e}")
+                self.proxy_task.cancel()
+                await asyncio.gather(self.proxy_task, return_exceptions=True)
+        finally:
+            self._stop_task = None
 
     def set_config_enabled(self, enabled):
         """Enable or disable configuration inputs."""
@@ -575,48 +631,59 @@ class ProxyGUI(QMainWindow):
         self.telegram_token_input.setEnabled(enabled)
         self.telegram_chat_input.setEnabled(enabled)
         self.disable_ssl_check.setEnabled(enabled)
+        self.nodelay_check.setEnabled(enabled)
+        self.reuse_port_check.setEnabled(enabled)
+        self.sndbuf_input.setEnabled(enabled)
+        self.rcvbuf_input.setEnabled(enabled)
 
+    @pyqtSlot(str)
     def update_status(self, status):
         """Update the status label."""
+        if status == self._last_status:
+            return
+        self._last_status = status
         self.status_label.setText(status)
-        if status == "Running":
-            self.status_label.setStyleSheet("font-weight: bold; color: green;")
-        elif status == "Stopped":
-            self.status_label.setStyleSheet("font-weight: bold; color: red;")
-        elif status == "Error":
-            self.status_label.setStyleSheet("font-weight: bold; color: orange;")
-        else:
-            self.status_label.setStyleSheet("font-weight: bold; color: yellow;")
+        self.status_label.setStyleSheet(self._STATUS_STYLES.get(status, self._STATUS_STYLE_OTHER))
 
+    @pyqtSlot(int)
     def update_client_count(self, count):
         """Update the client count display."""
         self.stats_clients.setText(f"Connected Clients: {count}")
 
+    @pyqtSlot(int, str, bool)
+    def update_client(self, client_id, address, added):
+        """Add or remove a client list entry; called by the proxy as clients come and go."""
+        if added:
+            item = QListWidgetItem(f"Client {client_id}: {address}")
+            self.clients_list.addItem(item)
+            self._known_clients[client_id] = item
+        else:
+            item = self._known_clients.pop(client_id, None)
+            if item is None:
+                return
+            self.clients_list.takeItem(self.clients_list.row(item))
+        self.update_client_count(len(self._known_clients))
+
+    @pyqtSlot(bool)
+    def update_radio_status(self, connected):
+        """Update the radio label; called by the proxy when the radio (dis)connects."""
+        if connected == self._last_radio_connected:
+            return
+        self._last_radio_connected = connected
+        text, style = self._RADIO_LABELS[connected]
+        self.stats_radio.setText(text)
+        self.stats_radio.setStyleSheet(style)
+
+    @pyqtSlot()
     def update_statistics(self):
-        """Update statistics display."""
-        # Update uptime
-        if self.start_time:
-            uptime = datetime.now() - self.start_time
-            hours = uptime.seconds // 3600
-            minutes = (uptime.seconds % 3600) // 60
-            seconds = uptime.seconds % 60
-            self.stats_uptime.setText(f"Uptime: {hours:02d}:{minutes:02d}:{seconds:02d}")
-
-        # Update client list
-        if self.proxy_thread and self.proxy_thread.proxy:
-            proxy = self.proxy_thread.proxy
-            self.clients_list.clear()
-            for client_id, client in proxy.clients.items():
-                self.clients_list.addItem(f"Client {client_id}: {client.address}")
-            self.stats_clients.setText(f"Connected Clients: {len(proxy.clients)}")
-
-            # Update radio status
-            if proxy.radio_connected.is_set():
-                self.stats_radio.setText("Radio: Connected")
-                self.stats_radio.setStyleSheet("color: green;")
-            else:
-                self.stats_radio.setText("Radio: Disconnected")
-                self.stats_radio.setStyleSheet("color: red;")
+        """Update the uptime display."""
+        if self.start_time is not None:
+            hours, rem = divmod(int(time.monotonic() - self.start_time), 3600)
+            minutes, seconds = divmod(rem, 60)
+            uptime = f"Uptime: {hours:02d}:{minutes:02d}:{seconds:02d}"
+            if uptime != self._last_uptime:
+                self._last_uptime = uptime
+                self.stats_uptime.setText(uptime)
 
     def save_settings(self):
         """Save configuration to settings."""
@@ -627,33 +694,58 @@ class ProxyGUI(QMainWindow):
         self.settings.setValue('channel_index', self.channel_input.value())
         self.settings.setValue('response_delay', self.delay_input.value())
         self.settings.setValue('disable_ssl_verify', self.disable_ssl_check.isChecked())
+        self.settings.setValue('tcp_nodelay', self.nodelay_check.isChecked())
+        self.settings.setValue('reuse_port', self.reuse_port_check.isChecked())
+        self.settings.setValue('sndbuf_kb', self.sndbuf_input.value())
+        self.settings.setValue('rcvbuf_kb', self.rcvbuf_input.value())
         # Note: API key is not saved for security
 
     def load_settings(self):
         """Load configuration from settings."""
-        self.listen_host_input.setText(self.settings.value('listen_host', '0.0.0.0'))
-        self.listen_port_input.setValue(int(self.settings.value('listen_port', 4404)))
-        self.radio_host_input.setText(self.settings.value('radio_host', '192.168.2.144'))
-        self.radio_port_input.setValue(int(self.settings.value('radio_port', 4403)))
-        self.channel_input.setValue(int(self.settings.value('channel_index', 2)))
-        self.delay_input.setValue(float(self.settings.value('response_delay', 2.0)))
-        self.disable_ssl_check.setChecked(self.settings.value('disable_ssl_verify', 'false') == 'true')
+        self.listen_host_input.setText(self.settings.value('listen_host', '0.0.0.0', type=str))
+        self.listen_port_input.setValue(self.settings.value('listen_port', 4404, type=int))
+        self.radio_host_input.setText(self.settings.value('radio_host', '192.168.2.144', type=str))
+        self.radio_port_input.setValue(self.settings.value('radio_port', 4403, type=int))
+        self.channel_input.setValue(self.settings.value('channel_index', 2, type=int))
+        self.delay_input.setValue(self.settings.value('response_delay', 2.0, type=float))
+        self.disable_ssl_check.setChecked(self.settings.value('disable_ssl_verify', False, type=bool))
+        self.nodelay_check.setChecked(self.settings.value('tcp_nodelay', True, type=bool))
+        self.reuse_port_check.setChecked(self.settings.value('reuse_port', False, type=bool))
+        self.sndbuf_input.setValue(self.settings.value('sndbuf_kb', 0, type=int))
+        self.rcvbuf_input.setValue(self.settings.value('rcvbuf_kb', 0, type=int))
 
     def closeEvent(self, event):
         """Handle window close event."""
-        if self.proxy_thread and self.proxy_thread.running:
-            self.stop_proxy()
+        if self.proxy_task and not self.proxy_task.done():
+            # Stop the proxy first, then close for real
+            event.ignore()
+            asyncio.ensure_future(self._stop_and_close())
+            return
+        self.log_listener.stop()
         event.accept()
 
+    async def _stop_and_close(self):
+        if self._stop_task is None:
+            self._stop_task = asyncio.ensure_future(self.stop_proxy())
+        await self._stop_task
+        self.close()
+
 
 def main():
     app = QApplication(sys.argv)
     app.setApplicationName("Meshtastic Proxy")
 
+    # Run asyncio on the Qt event loop so the proxy shares the GUI thread
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    app_closed = asyncio.Event()
+    app.aboutToQuit.connect(app_closed.set)
+
     window = ProxyGUI()
     window.show()
 
-    sys.exit(app.exec())
+    with loop:
+        loop.run_until_complete(app_closed.wait())
 
 
 if __name__ == '__main__':
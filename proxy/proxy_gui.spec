@@ -18,6 +18,7 @@ a = Analysis(
         'PyQt6.QtCore',
         'PyQt6.QtGui',
         'PyQt6.QtWidgets',
+        'qasync',
         'asyncio',
         'logging',
     ],
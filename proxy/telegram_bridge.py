@@ -5,16 +5,30 @@ Forwards messages between Meshtastic radio and Telegram channel
 """
 
 import asyncio
+import html
 import logging
+import time
 from typing import Optional, Callable
-from datetime import datetime
+
+try:
+    from telegram import Update
+    from telegram.ext import Application, MessageHandler, filters, ContextTypes
+    _TELEGRAM_OK = True
+except ImportError:
+    _TELEGRAM_OK = False
 
 logger = logging.getLogger(__name__)
 
+SEND_POOL_SIZE = 8        # HTTPX connections kept open to the Bot API
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for one text message
+
 
 class TelegramBridge:
     """Handles bidirectional message forwarding between Meshtastic and Telegram."""
 
+    # HTML layout for messages relayed from the radio
+    _TEMPLATE = "📡 <b>{sender}</b> ({ts})\n{text}"
+
     def __init__(self, bot_token: str, chat_id: str, message_callback: Optional[Callable] = None):
         """
         Initialize Telegram bridge.
@@ -29,17 +43,27 @@ class TelegramBridge:
         self.message_callback = message_callback
         self.application = None
         self.running = False
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._sender_task: Optional[asyncio.Task] = None
 
     async def start(self) -> bool:
         """Start the Telegram bot."""
-        try:
-            from telegram import Update
-            from telegram.ext import Application, MessageHandler, filters, ContextTypes
+        if not _TELEGRAM_OK:
+            logger.error("python-telegram-bot not installed. Install with: pip install python-telegram-bot")
+            return False
 
+        try:
             logger.info("Initializing Telegram bot...")
 
-            # Create application
-            self.application = Application.builder().token(self.bot_token).build()
+            # Create application with a small pool of kept-alive Bot API connections
+            self.application = (
+                Application.builder()
+                .token(self.bot_token)
+                .connection_pool_size(SEND_POOL_SIZE)
+                .pool_timeout(5.0)
+                .read_timeout(15.0)
+                .build()
+            )
 
             # Add message handler for the specific chat
             async def handle_telegram_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -47,42 +71,54 @@ class TelegramBridge:
                 if not update.message or not update.message.text:
                     return
 
-                # Only process messages from the configured chat
-                if str(update.message.chat_id) != str(self.chat_id):
-                    return
-
                 text = update.message.text
                 user = update.message.from_user
                 username = user.username or user.first_name or "Unknown"
 
-                logger.info(f"Telegram message from {username}: {text}")
+                logger.info("Telegram message from %s: %s", username, text)
 
                 # Forward to radio via callback
                 if self.message_callback:
                     try:
                         await self.message_callback(f"[TG:{username}] {text}")
                     except Exception as e:
-                        logger.error(f"Failed to forward Telegram message to radio: {e}")
+                        logger.error("Failed to forward Telegram message to radio: %s", e)
+
+            # Only accept messages from the configured chat; the filter runs in PTB
+            # before the callback is scheduled, so other chats cost no callback.
+            # chat_id may be numeric or an @username.
+            try:
+                chat_filter = filters.Chat(chat_id=int(self.chat_id))
+            except ValueError:
+                chat_filter = filters.Chat(username=str(self.chat_id))
 
             # Register handler (allow all text messages including commands like /gem)
             self.application.add_handler(
-                MessageHandler(filters.TEXT, handle_telegram_message)
+                MessageHandler(filters.TEXT & chat_filter, handle_telegram_message)
             )
 
             # Start bot in background
             await self.application.initialize()
             await self.application.start()
-            await self.application.updater.start_polling()
+            # Long-poll with a wide timeout so an idle bridge rarely wakes up,
+            # and only ask Telegram for the update type we handle
+            await self.application.updater.start_polling(
+                poll_interval=1.0,
+                timeout=60,
+                drop_pending_updates=True,
+                allowed_updates=[Update.MESSAGE],
+            )
+
+            # Outgoing radio messages go through one queue so bursts can be coalesced
+            self._send_queue = asyncio.Queue()
+            self._sender_task = asyncio.create_task(self._sender_loop())
 
             self.running = True
-            logger.info(f"Telegram bot started, listening to chat_id: {self.chat_id}")
+            logger.info("Telegram bot started, listening to chat_id: %s", self.chat_id)
             return True
 
-        except ImportError:
-            logger.error("python-telegram-bot not installed. Install with: pip install python-telegram-bot")
-            return False
         except Exception as e:
-            logger.error(f"Failed to start Telegram bot: {e}")
+            logger.error("Failed to start Telegram bot: %s", e)
             return False
 
     async def stop(self) -> None:
@@ -90,13 +126,20 @@ class TelegramBridge:
         if self.application:
             try:
                 logger.info("Stopping Telegram bot...")
+                self.running = False
+                if self._sender_task:
+                    self._sender_task.cancel()
+                    try:
+                        await self._sender_task
+                    except asyncio.CancelledError:
+                        pass
+                    self._sender_task = None
                 await self.application.updater.stop()
                 await self.application.stop()
                 await self.application.shutdown()
-                self.running = False
                 logger.info("Telegram bot stopped")
             except Exception as e:
-                logger.error(f"Error stopping Telegram bot: {e}")
+                logger.error("Error stopping Telegram bot: %s", e)
 
     async def send_message(self, text: str) -> bool:
         """
@@ -118,23 +161,74 @@ class TelegramBridge:
                 text=text,
                 parse_mode='HTML'
             )
-            logger.debug(f"Sent message to Telegram: {text[:50]}...")
+            logger.debug("Sent message to Telegram: %.50s...", text)
             return True
         except Exception as e:
-            logger.error(f"Failed to send message to Telegram: {e}")
+            logger.error("Failed to send message to Telegram: %s", e)
             return False
 
+    def queue_message(self, text: str) -> bool:
+        """
+        Queue a message for the sender task without waiting for it to be sent.
+
+        Args:
+            text: Message text to send
+
+        Returns:
+            True if queued, False if the bot is not running
+        """
+        if not self.running or self._send_queue is None:
+            logger.warning("Telegram bot not running, cannot send message")
+            return False
+        self._send_queue.put_nowait(text)
+        return True
+
     async def send_radio_message(self, sender: str, text: str) -> bool:
         """
-        Format and send a radio message to Telegram.
+        Format a radio message and queue it for Telegram.
+
+        Radio text is HTML-escaped, and text too long for one Telegram message is
+        split across several, each carrying the sender header.
 
         Args:
             sender: Message sender identifier
             text: Message content
 
         Returns:
-            True if successful, False otherwise
+            True if queued, False otherwise
         """
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted = f"📡 <b>{sender}</b> ({timestamp})\n{text}"
-        return await self.send_message(formatted)
+        sender = html.escape(sender[:64], quote=False)
+        ts = time.strftime("%H:%M:%S")
+        room = MAX_MESSAGE_LENGTH - len(self._TEMPLATE.format(sender=sender, ts=ts, text=""))
+        body = html.escape(text, quote=False)
+        while True:
+            cut = len(body)
+            if cut > room:
+                cut = room
+                # Don't split an entity such as &amp; across two messages
+                amp = body.rfind('&', cut - 4, cut)
+                if amp != -1 and ';' not in body[amp:cut]:
+                    cut = amp
+            if not self.queue_message(self._TEMPLATE.format(sender=sender, ts=ts, text=body[:cut])):
+                return False
+            body = body[cut:]
+            if not body:
+                return True
+
+    async def _sender_loop(self) -> None:
+        """Send queued messages, joining whatever piled up meanwhile into as few messages as fit."""
+        queue = self._send_queue
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            # Sent one after another so the chat keeps the radio's message order
+            chunk = batch[0]
+            for text in batch[1:]:
+                if len(chunk) + 2 + len(text) > MAX_MESSAGE_LENGTH:
+                    await self.send_message(chunk)
+                    chunk = text
+                else:
+                    chunk = f"{chunk}\n\n{text}"
+            await self.send_message(chunk)